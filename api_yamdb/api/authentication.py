@@ -0,0 +1,99 @@
+"""
+Аутентификация по JWT без запроса пользователя к базе.
+
+Токен, который выдаёт get_token, содержит username, роль и флаги
+is_staff/is_superuser. StatelessJWTAuthentication собирает из них
+несохранённый объект User: его хватает разрешениям из api.permissions
+и полям author. Токены без этих claims проверяются по базе, как раньше.
+
+Отозванные токены хранятся в кеше JWT_DENYLIST_CACHE_ALIAS: отдельные —
+по jti, все токены пользователя — по времени отзыва. Изменение роли,
+блокировка и удаление пользователя отзывают его токены (api.signals).
+Кеш должен быть общим для всех процессов и не вытеснять записи до
+истечения их срока, иначе отозванный токен снова будет принят.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+AUTH_TIME_CLAIM = 'auth_time'
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с ролью пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[AUTH_TIME_CLAIM] = time.time()
+        return token
+
+
+def get_denylist():
+    return caches[settings.JWT_DENYLIST_CACHE_ALIAS]
+
+
+def token_key(jti):
+    return f'jwt-denied:{jti}'
+
+
+def user_key(user_id):
+    return f'jwt-denied-user:{user_id}'
+
+
+def revoke_token(token):
+    """Отзывает один токен до истечения его срока."""
+    remaining = token['exp'] - time.time()
+    if remaining > 0:
+        get_denylist().set(
+            token_key(token[api_settings.JTI_CLAIM]), True, remaining
+        )
+
+
+def revoke_user_tokens(user_id):
+    """Отзывает токены с ролью, выданные пользователю до этого момента."""
+    get_denylist().set(
+        user_key(user_id), time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def is_revoked(token):
+    keys = [token_key(token[api_settings.JTI_CLAIM])]
+    if AUTH_TIME_CLAIM in token:
+        keys.append(user_key(token[api_settings.USER_ID_CLAIM]))
+    denied = get_denylist().get_many(keys)
+    if keys[0] in denied:
+        return True
+    revoked_at = denied.get(keys[-1]) if len(keys) > 1 else None
+    return revoked_at is not None and token[AUTH_TIME_CLAIM] <= revoked_at
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken('Токен отозван.')
+        return token
+
+    def get_user(self, validated_token):
+        if AUTH_TIME_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = User(
+            pk=validated_token[api_settings.USER_ID_CLAIM],
+            **{claim: validated_token[claim] for claim in ROLE_CLAIMS}
+        )
+        user._state.adding = False
+        return user
@@ -0,0 +1,44 @@
+"""
+Массовая запись каталога: POST .../bulk/ создаёт, PATCH .../bulk/
+изменяет список объектов одним запросом администратора.
+
+Список проверяется целиком: ошибки возвращаются по элементу на объект
+(пустой словарь для верных), и при любой ошибке ничего не записывается.
+Запись выполняется одной транзакцией через bulk_create/bulk_update,
+поэтому сигналы моделей не срабатывают и версии кеша ответов
+увеличиваются здесь.
+"""
+
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .cache import bump_versions
+from .permissions import IsAdmin
+
+
+class BulkWriteMixin:
+    bulk_serializer_class = None
+    bulk_cache_versions = ()
+
+    @action(detail=False, methods=('post', 'patch'),
+            permission_classes=(IsAdmin,))
+    def bulk(self, request, *args, **kwargs):
+        serializer = self.bulk_serializer_class(
+            data=request.data, many=True,
+            partial=request.method == 'PATCH',
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objects = serializer.save()
+        bump_versions(*self.bulk_cache_versions)
+        return Response(
+            self.get_bulk_response_data(serializer, objects),
+            status=(status.HTTP_200_OK if serializer.partial
+                    else status.HTTP_201_CREATED),
+        )
+
+    def get_bulk_response_data(self, serializer, objects):
+        return serializer.data
@@ -0,0 +1,113 @@
+"""
+Кеш ответов на анонимные GET-запросы к каталогу.
+
+Ключ ответа включает путь, отсортированные параметры запроса и версии
+ресурса. Сигналы моделей (api.signals) увеличивают версии после
+коммита транзакции, поэтому устаревшие ответы просто перестают
+находиться и истекают по таймауту. Промах кеша читает с основной базы:
+ответ с отстающей реплики остался бы под новой версией.
+Версии ресурса:
+
+* ``<resource>`` — весь ресурс, входит во все ключи;
+* ``<resource>:list`` — только списки;
+* ``<resource>:<pk>`` — один объект.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from api_yamdb.db.router import use_replicas
+
+from .metrics import registry
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(name):
+    return f'version:{name}'
+
+
+def bump_versions(*names):
+    """
+    Делает недействительными ответы, зависящие от этих версий, после
+    коммита текущей транзакции: до него запрос прочитал бы старые данные
+    и сохранил их под новой версией.
+    """
+    transaction.on_commit(lambda: increment_versions(names))
+
+
+def increment_versions(names):
+    cache = get_cache()
+    for name in names:
+        try:
+            cache.incr(version_key(name))
+        except ValueError:
+            cache.set(version_key(name), time.time_ns(), None)
+
+
+def get_versions(names):
+    cache = get_cache()
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Начинаем со времени, а не с нуля: если версия вытеснена
+            # из кеша, старые ответы не совпадут с новыми ключами.
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def response_key(request, names):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    versions = '.'.join(str(version) for version in get_versions(names))
+    return f'response:{versions}:{digest}'
+
+
+class CachedResponseMixin:
+    """Кеширует данные успешных ответов для анонимных пользователей."""
+    cache_resource = None
+
+    def cached_response(self, handler, names, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = response_key(request, (self.cache_resource, *names))
+        data = cache.get(key)
+        if data is not None:
+            registry.inc('api_cache_requests_total', (('result', 'hit'),))
+            return Response(data)
+        registry.inc('api_cache_requests_total', (('result', 'miss'),))
+        with use_replicas(False):
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().list, (f'{self.cache_resource}:list',),
+            request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.cached_response(
+            super().retrieve, (f'{self.cache_resource}:{lookup}',),
+            request, *args, **kwargs
+        )
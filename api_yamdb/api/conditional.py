@@ -0,0 +1,38 @@
+"""Условные GET-запросы по версии и дате изменения произведения."""
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from reviews.models import Title
+
+
+def title_validators(title_id, representation):
+    """ETag и Last-Modified произведения одним запросом к базе."""
+    state = Title.objects.filter(pk=title_id).order_by('pk').values_list(
+        'version', 'modified'
+    ).first()
+    if state is None:
+        raise Http404
+    version, modified = state
+    return (
+        quote_etag(f'title-{title_id}-{representation}-v{version}'),
+        int(modified.timestamp()),
+    )
+
+
+def conditional_response(request, validators, handler, *args, **kwargs):
+    """
+    Отвечает 304 без вызова обработчика, если у клиента актуальная
+    версия, иначе добавляет к ответу ETag и Last-Modified.
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request._request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = handler(request, *args, **kwargs)
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,166 @@
+"""
+Быстрое представление списков без экземпляров моделей.
+
+Строки читаются через values_list ровно с теми полями, которые объявлены
+в Meta.fields сериализатора, и словари собираются напрямую, без
+сериализатора на каждый объект. Значения приводятся методами
+to_representation тех же полей DRF, поэтому JSON совпадает с обычным
+путём. Поддерживаются простые поля, SlugRelatedField, вложенный
+сериализатор по внешнему ключу и вложенный many=True по ManyToMany;
+для остального FastSerializer выбрасывает ImproperlyConfigured.
+Включается настройкой FAST_LIST_SERIALIZERS.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import RelatedField, SlugRelatedField
+from rest_framework.response import Response
+
+from .timing import serializer_timer
+
+
+def field_path(field, prefix=''):
+    if field.source == '*' or isinstance(
+        field, serializers.SerializerMethodField
+    ):
+        raise ImproperlyConfigured(
+            f'Поле {field.field_name} не читается из values_list.'
+        )
+    return prefix + field.source.replace('.', '__')
+
+
+class FastSerializer:
+    """Собирает представления объектов из строк values_list."""
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.paths = []
+        self.related = []
+        self.builders = [
+            (name, self.builder(field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+        if self.related:
+            self.pk_index = self.column(self.model._meta.pk.name)
+
+    def column(self, path):
+        if path not in self.paths:
+            self.paths.append(path)
+        return self.paths.index(path)
+
+    def builder(self, field, prefix=''):
+        if isinstance(field, serializers.ListSerializer):
+            return self.many_builder(field)
+        if isinstance(field, serializers.BaseSerializer):
+            return self.nested_builder(field, prefix)
+        if isinstance(field, SlugRelatedField):
+            index = self.column(
+                f'{field_path(field, prefix)}__{field.slug_field}'
+            )
+            return lambda row, related: row[index]
+        if isinstance(field, (RelatedField, serializers.ManyRelatedField)):
+            raise ImproperlyConfigured(
+                f'Поле {field.field_name} не поддерживается.'
+            )
+        index = self.column(field_path(field, prefix))
+        convert = field.to_representation
+
+        def build(row, related):
+            value = row[index]
+            return None if value is None else convert(value)
+        return build
+
+    def nested_builder(self, serializer, prefix):
+        path = field_path(serializer, prefix)
+        key = self.column(path)
+        builders = [
+            (name, self.builder(field, f'{path}__'))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+        def build(row, related):
+            if row[key] is None:
+                return None
+            return {name: make(row, related) for name, make in builders}
+        return build
+
+    def many_builder(self, serializer):
+        relation = self.model._meta.get_field(field_path(serializer))
+        child = FastSerializer(serializer.child)
+        if not relation.many_to_many or relation.auto_created or (
+            child.related
+        ):
+            raise ImproperlyConfigured(
+                f'Поле {serializer.field_name} не поддерживается.'
+            )
+        position = len(self.related)
+        self.related.append((relation, child))
+        return lambda row, related: related[position].get(
+            row[self.pk_index], []
+        )
+
+    def rows(self, queryset):
+        """values_list с полями сериализатора; строки — namedtuple."""
+        return queryset.prefetch_related(None).values_list(
+            *self.paths, named=True
+        )
+
+    def fetch_related(self, rows):
+        """
+        Объекты ManyToMany для строк одним запросом к промежуточной
+        таблице на каждое поле, в порядке модели, как prefetch_related.
+        """
+        pks = [row[self.pk_index] for row in rows]
+        result = []
+        for relation, child in self.related:
+            source = relation.m2m_field_name()
+            target = relation.m2m_reverse_field_name()
+            ordering = [
+                f'-{target}__{name[1:]}' if name.startswith('-')
+                else f'{target}__{name}'
+                for name in relation.related_model._meta.ordering
+            ]
+            links = relation.remote_field.through.objects.filter(
+                **{f'{source}__in': pks}
+            ).order_by(*ordering).values_list(
+                source, *(f'{target}__{path}' for path in child.paths)
+            )
+            items = defaultdict(list)
+            for owner, *values in links:
+                items[owner].append(child.build(values, ()))
+            result.append(items)
+        return result
+
+    def build(self, row, related):
+        return {name: make(row, related) for name, make in self.builders}
+
+    def serialize(self, rows):
+        rows = list(rows)
+        with serializer_timer():
+            related = self.fetch_related(rows) if self.related else ()
+            return [self.build(row, related) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_fast_serializer(serializer_class):
+    return FastSerializer(serializer_class())
+
+
+class FastListMixin:
+    """list() через FastSerializer, если включено FAST_LIST_SERIALIZERS."""
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        fast = get_fast_serializer(self.get_serializer_class())
+        rows = fast.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(rows))
@@ -0,0 +1,42 @@
+from django.utils.encoding import smart_str
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import (MANY_RELATION_KWARGS, ManyRelatedField,
+                                      SlugRelatedField)
+
+
+class ManySlugRelatedField(ManyRelatedField):
+    """Список slug, разрешаемый одним запросом ``slug__in``."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        if not all(isinstance(item, str) for item in data):
+            child.fail('invalid')
+        slugs = list(dict.fromkeys(data))
+        found = child.get_queryset().in_bulk(
+            slugs, field_name=child.slug_field
+        )
+        missing = [slug for slug in slugs if slug not in found]
+        if missing:
+            raise ValidationError([
+                child.error_messages['does_not_exist'].format(
+                    slug_name=child.slug_field, value=smart_str(slug)
+                )
+                for slug in missing
+            ])
+        return [found[slug] for slug in slugs]
+
+
+class BatchedSlugRelatedField(SlugRelatedField):
+    """SlugRelatedField, который с many=True не делает запрос на каждый slug"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
@@ -1,13 +1,92 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+import sys
+
+from django_filters.rest_framework import (CharFilter, FilterSet,
+                                           NumberFilter, OrderingFilter)
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
+from reviews.search import get_ngram_search, get_title_search
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    Сортировка с id в конце: страницы не теряют и не повторяют записи
+    с равными значениями, а порядок остаётся порядком индекса.
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value:
+            descending = qs.query.order_by[0].startswith('-')
+            qs = qs.order_by(*qs.query.order_by,
+                             '-pk' if descending else 'pk')
+        return qs
 
 
 class TitleFilter(FilterSet):
     name = CharFilter(field_name='name', lookup_expr='icontains')
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
+    search = CharFilter(method='filter_search')
+    year_min = NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = NumberFilter(field_name='rating', lookup_expr='gte')
+    ordering = StableOrderingFilter(fields=(
+        ('name', 'name'),
+        ('year', 'year'),
+        ('rating', 'rating'),
+        ('rating_count', 'reviews'),
+    ))
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'category', 'genre')
+        fields = ('name', 'year', 'category', 'genre', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return get_title_search().search(queryset, value)
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    Поиск по одному полю с выбором режима в параметре ``search_mode``.
+
+    * ``contains`` (по умолчанию) — подстрока в ``search_fields[0]``
+      через n-граммный индекс;
+    * ``prefix`` — начало значения ``search_key_field``, диапазон по
+      уникальному B-tree индексу (с учётом регистра);
+    * ``exact`` — точное совпадение с ``search_key_field``.
+    """
+    search_mode_param = 'search_mode'
+    search_modes = ('contains', 'prefix', 'exact')
+
+    def get_search_mode(self, request):
+        mode = request.query_params.get(self.search_mode_param, 'contains')
+        if mode not in self.search_modes:
+            raise ValidationError({self.search_mode_param: [
+                f'Допустимые значения: {", ".join(self.search_modes)}.'
+            ]})
+        return mode
+
+    def filter_queryset(self, request, queryset, view):
+        mode = self.get_search_mode(request)
+        if mode == 'contains':
+            terms = self.get_search_terms(request)
+            if not terms:
+                return queryset
+            field_name = getattr(view, 'search_fields', ('name',))[0]
+            return get_ngram_search().search(queryset, field_name, terms)
+        value = request.query_params.get(self.search_param, '').strip()
+        if not value:
+            return queryset
+        key = view.search_key_field
+        if mode == 'exact':
+            return queryset.filter(**{key: value})
+        queryset = queryset.filter(**{f'{key}__gte': value})
+        # Верхняя граница — префикс с увеличенным последним символом;
+        # символы U+10FFFF увеличить нельзя, они отбрасываются.
+        upper = value.rstrip(chr(sys.maxunicode))
+        if not upper:
+            return queryset
+        upper = upper[:-1] + chr(ord(upper[-1]) + 1)
+        return queryset.filter(**{f'{key}__lt': upper})
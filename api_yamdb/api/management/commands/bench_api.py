@@ -0,0 +1,304 @@
+import json
+import platform
+import statistics
+import subprocess
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+
+import django
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+
+from api.authentication import RoleAccessToken
+from reviews.models import Comment, Review
+from reviews.seed import SIZES, seed_dataset
+from users.models import User
+
+API = '/api/v1'
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    data: dict = field(default_factory=dict)
+    client: str = 'admin'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a reproducible dataset inside a rolled back transaction, '
+        'call every API endpoint and report latency percentiles, '
+        'throughput and query counts'
+    )
+
+    def add_arguments(self, parser):
+        size = parser.add_mutually_exclusive_group()
+        size.add_argument('--size', choices=SIZES, default='small')
+        size.add_argument('--reviews', type=int)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Benchmark only endpoints with this name prefix.'
+        )
+        parser.add_argument('--output', default='bench_api.json')
+        parser.add_argument(
+            '--compare', help='Results of an earlier run to compare with.'
+        )
+        parser.add_argument(
+            '--max-regression', type=float, default=20.0,
+            help='Allowed p95 growth in percent before a regression.'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Fail when the comparison finds regressions.'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 2:
+            raise CommandError('--repeat must be at least 2')
+        reviews = options['reviews'] or SIZES[options['size']]
+        self.warmup = options['warmup']
+        with override_settings(
+            DEBUG=False,
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            EMAIL_QUEUE_BACKEND='emails.queue.SyncEmailQueue',
+        ), transaction.atomic():
+            started = perf_counter()
+            dataset = seed_dataset(reviews, options['seed'],
+                                   options['batch_size'])
+            self.stdout.write(
+                f'Seeded {reviews} reviews in {perf_counter() - started:.1f}s'
+            )
+            self.clients = self.make_clients()
+            results = {}
+            for endpoint in self.endpoints(dataset):
+                if options['endpoints'] and not endpoint.name.startswith(
+                    tuple(options['endpoints'])
+                ):
+                    continue
+                results[endpoint.name] = self.measure(
+                    endpoint, options['repeat']
+                )
+                self.report(endpoint.name, results[endpoint.name])
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'commit': self.commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'reviews': reviews,
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'endpoints': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Results written to {options["output"]}'
+        ))
+        if options['compare']:
+            self.compare(options['compare'], report, options)
+
+    def make_clients(self):
+        self.admin = User.objects.create(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role=User.ADMIN,
+        )
+        token = RoleAccessToken.for_user(self.admin)
+        return {
+            'admin': Client(HTTP_AUTHORIZATION=f'Bearer {token}'),
+            'anonymous': Client(),
+        }
+
+    def endpoints(self, dataset):
+        title = dataset.titles[0]
+        reviews = f'{API}/titles/{title}/reviews'
+        review = (
+            Comment.objects.filter(review__title_id=title)
+            .values('review').annotate(total=Count('id'))
+            .order_by('-total').values_list('review', flat=True).first()
+            or Review.objects.filter(title_id=title).values_list(
+                'pk', flat=True
+            ).first()
+        )
+        comments = f'{reviews}/{review}/comments'
+        comment = Comment.objects.filter(review_id=review).values_list(
+            'pk', flat=True
+        ).first()
+        last_page = -(-len(dataset.titles) // 5)
+        user = 'seed_user_0'
+        return [
+            Endpoint('auth.signup', 'POST', f'{API}/auth/signup/', {
+                'username': 'bench_signup', 'email': 'bench_signup@yamdb.fake'
+            }, client='anonymous'),
+            Endpoint('auth.token', 'POST', f'{API}/auth/token/', {
+                'username': self.admin.username,
+                'confirmation_code':
+                    default_token_generator.make_token(self.admin),
+            }, client='anonymous'),
+            Endpoint('users.list', 'GET', f'{API}/users/'),
+            Endpoint('users.search', 'GET', f'{API}/users/',
+                     {'search': 'user_1'}),
+            Endpoint('users.detail', 'GET', f'{API}/users/{user}/'),
+            Endpoint('users.me', 'GET', f'{API}/users/me/'),
+            Endpoint('users.create', 'POST', f'{API}/users/', {
+                'username': 'bench_new', 'email': 'bench_new@yamdb.fake'
+            }),
+            Endpoint('users.update', 'PATCH', f'{API}/users/{user}/',
+                     {'bio': 'bench'}),
+            Endpoint('users.delete', 'DELETE', f'{API}/users/{user}/'),
+            Endpoint('genres.list', 'GET', f'{API}/genres/'),
+            Endpoint('genres.search', 'GET', f'{API}/genres/',
+                     {'search': 'дра'}),
+            Endpoint('genres.create', 'POST', f'{API}/genres/',
+                     {'name': 'Бенчмарк', 'slug': 'bench'}),
+            Endpoint('genres.delete', 'DELETE',
+                     f'{API}/genres/seed-genre-0/'),
+            Endpoint('categories.list', 'GET', f'{API}/categories/'),
+            Endpoint('categories.create', 'POST', f'{API}/categories/',
+                     {'name': 'Бенчмарк', 'slug': 'bench'}),
+            Endpoint('categories.delete', 'DELETE',
+                     f'{API}/categories/seed-category-0/'),
+            Endpoint('titles.list', 'GET', f'{API}/titles/'),
+            Endpoint('titles.list_cached', 'GET', f'{API}/titles/',
+                     client='anonymous'),
+            Endpoint('titles.last_page', 'GET', f'{API}/titles/',
+                     {'page': last_page}),
+            Endpoint('titles.filter', 'GET', f'{API}/titles/',
+                     {'genre': 'seed-genre-0', 'year': 2000}),
+            Endpoint('titles.search', 'GET', f'{API}/titles/',
+                     {'search': 'отец'}),
+            Endpoint('titles.detail', 'GET', f'{API}/titles/{title}/'),
+            Endpoint('titles.create', 'POST', f'{API}/titles/', {
+                'name': 'Бенчмарк', 'year': 2000,
+                'genre': ['seed-genre-0'], 'category': 'seed-category-0',
+            }),
+            Endpoint('titles.update', 'PATCH', f'{API}/titles/{title}/',
+                     {'description': 'bench'}),
+            Endpoint('titles.delete', 'DELETE', f'{API}/titles/{title}/'),
+            Endpoint('reviews.list', 'GET', f'{reviews}/'),
+            Endpoint('reviews.keyset', 'GET', f'{reviews}/', {'cursor': ''}),
+            Endpoint('reviews.detail', 'GET', f'{reviews}/{review}/'),
+            Endpoint('reviews.create', 'POST', f'{reviews}/',
+                     {'text': 'bench', 'score': 5}),
+            Endpoint('reviews.update', 'PATCH', f'{reviews}/{review}/',
+                     {'score': 7}),
+            Endpoint('reviews.delete', 'DELETE', f'{reviews}/{review}/'),
+            Endpoint('comments.list', 'GET', f'{comments}/'),
+            Endpoint('comments.detail', 'GET', f'{comments}/{comment}/'),
+            Endpoint('comments.create', 'POST', f'{comments}/',
+                     {'text': 'bench'}),
+            Endpoint('comments.update', 'PATCH',
+                     f'{comments}/{comment}/', {'text': 'bench'}),
+            Endpoint('comments.delete', 'DELETE', f'{comments}/{comment}/'),
+            Endpoint('export.reviews', 'GET', f'{API}/export/review.jsonl'),
+        ]
+
+    def request(self, endpoint):
+        """Выполняет запрос и откатывает все его изменения."""
+        client = self.clients[endpoint.client]
+        with transaction.atomic():
+            if endpoint.method == 'GET':
+                response = client.get(endpoint.path, endpoint.data)
+            else:
+                response = client.generic(
+                    endpoint.method, endpoint.path,
+                    json.dumps(endpoint.data), 'application/json'
+                )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, endpoint, repeat):
+        for _ in range(self.warmup):
+            self.request(endpoint)
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Тестовый клиент очищает connection.queries в начале запроса,
+        # поэтому запросы считаются обёрткой.
+        with connection.execute_wrapper(count):
+            response = self.request(endpoint)
+        timings = []
+        for _ in range(repeat):
+            started = perf_counter()
+            self.request(endpoint)
+            timings.append((perf_counter() - started) * 1000)
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+        return {
+            'method': endpoint.method,
+            'path': endpoint.path,
+            'status': response.status_code,
+            # Без SAVEPOINT/RELEASE, которыми request() откатывает запрос.
+            'queries': sum(
+                not sql.startswith(('SAVEPOINT', 'RELEASE', 'ROLLBACK'))
+                for sql in queries
+            ),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+            'rps': round(repeat / sum(timings) * 1000, 1),
+        }
+
+    def report(self, name, result):
+        line = (
+            f'{name:<22} {result["status"]} '
+            f'p50 {result["p50_ms"]:>8.2f} ms  '
+            f'p95 {result["p95_ms"]:>8.2f} ms  '
+            f'p99 {result["p99_ms"]:>8.2f} ms  '
+            f'{result["rps"]:>8.1f} rps  {result["queries"]:>3} queries'
+        )
+        if result['status'] >= 400:
+            line = self.style.WARNING(line)
+        self.stdout.write(line)
+
+    @staticmethod
+    def commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, path, report, options):
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        self.stdout.write(
+            f'Compared with {baseline["meta"].get("commit") or path}:'
+        )
+        regressions = []
+        for name, result in report['endpoints'].items():
+            old = baseline['endpoints'].get(name)
+            if old is None:
+                continue
+            growth = (result['p95_ms'] / old['p95_ms'] - 1) * 100
+            queries = result['queries'] - old['queries']
+            line = f'{name:<22} p95 {growth:+7.1f}%  queries {queries:+d}'
+            if growth > options['max_regression'] or queries > 0:
+                regressions.append(name)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions and options['strict']:
+            raise CommandError(
+                f'Regressions in: {", ".join(regressions)}'
+            )
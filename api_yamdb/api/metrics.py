@@ -0,0 +1,254 @@
+"""
+Метрики в формате Prometheus.
+
+Каждый поток пишет в собственный словарь счётчиков, поэтому запись
+не берёт блокировок; при чтении словари потоков суммируются. Словари
+завершившихся потоков сливаются в общий при чтении.
+
+При нескольких процессах WSGI-сервера задайте METRICS_DIR — общий
+каталог: процесс не чаще раза в METRICS_FLUSH_INTERVAL секунд
+сохраняет туда свои значения, а /metrics суммирует файлы всех
+процессов. Гауги завершившихся процессов не учитываются.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+METRICS = {
+    'http_requests_total': (COUNTER, 'Requests by route, method and status.'),
+    'http_request_duration_seconds': (HISTOGRAM, 'Request latency by route.'),
+    'http_requests_in_flight': (GAUGE, 'Requests being processed.'),
+    'db_queries_total': (COUNTER, 'SQL queries by route.'),
+    'db_query_duration_seconds': (HISTOGRAM, 'SQL query duration.'),
+    'api_cache_requests_total': (COUNTER, 'Response cache lookups.'),
+    'emails_total': (COUNTER, 'Email delivery attempts by result.'),
+    'email_delivery_seconds': (
+        HISTOGRAM, 'Time from enqueueing an email to its delivery.'
+    ),
+}
+
+
+class Registry:
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._retired = defaultdict(float)
+        self._flush_lock = threading.Lock()
+        self._flushed_at = 0.0
+
+    def values(self):
+        values = getattr(self._local, 'values', None)
+        if values is None:
+            values = self._local.values = defaultdict(float)
+            with self._lock:
+                self._threads.append((threading.current_thread(), values))
+        return values
+
+    def inc(self, name, labels=(), amount=1):
+        self.values()[(name, labels)] += amount
+
+    def observe(self, name, labels, value):
+        values = self.values()
+        bucket = bisect.bisect_left(BUCKETS, value)
+        values[(name, (*labels, ('le', bucket)))] += 1
+        values[(name, (*labels, ('sum', None)))] += value
+
+    def snapshot(self):
+        """Сумма значений всех потоков процесса."""
+        with self._lock:
+            alive = []
+            for thread, values in self._threads:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    merge(self._retired, dict(values))
+            self._threads = alive
+            total = defaultdict(float, self._retired)
+            for _, values in alive:
+                merge(total, dict(values))
+        return total
+
+    def clear(self):
+        with self._lock:
+            for _, values in self._threads:
+                values.clear()
+            self._retired.clear()
+
+    def flush(self, force=False):
+        """
+        Сохраняет значения процесса в METRICS_DIR. Если сохраняет другой
+        поток, запрос не ждёт его; ошибки записи не прерывают запрос.
+        """
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = monotonic()
+            if not force and now - self._flushed_at < (
+                settings.METRICS_FLUSH_INTERVAL
+            ):
+                return
+            self._flushed_at = now
+            path = os.path.join(directory, f'{os.getpid()}.json')
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump([[name, labels, value] for (name, labels), value
+                           in self.snapshot().items()], f)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception('Failed to flush metrics to %s', directory)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """Значения всех процессов: своего и сохранённых в METRICS_DIR."""
+        total = self.snapshot()
+        directory = settings.METRICS_DIR
+        if not directory:
+            return total
+        for filename in os.listdir(directory):
+            pid, ext = os.path.splitext(filename)
+            if ext != '.json' or pid == str(os.getpid()):
+                continue
+            alive = process_alive(int(pid))
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in saved:
+                if alive or METRICS[name][0] != GAUGE:
+                    key = (name, tuple(tuple(label) for label in labels))
+                    total[key] += value
+        return total
+
+
+def merge(target, values):
+    for key, value in values.items():
+        target[key] += value
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+registry = Registry()
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        f'{key}="{value}"' for key, value in labels
+    )
+
+
+def render(values, gauges=()):
+    """Текст в формате экспозиции Prometheus."""
+    series = defaultdict(dict)
+    for (name, labels), value in values.items():
+        series[name][labels] = value
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == HISTOGRAM:
+            lines.extend(render_histogram(name, series[name]))
+            continue
+        for labels, value in sorted(series[name].items()):
+            lines.append(f'{name}{format_labels(labels)} {value:g}')
+    for name, help_text, value in gauges:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {GAUGE}')
+        lines.append(f'{name} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_histogram(name, values):
+    histograms = defaultdict(lambda: ([0.0] * (len(BUCKETS) + 1), [0.0]))
+    for labels, value in values.items():
+        *labels, (kind, bucket) = labels
+        counts, total = histograms[tuple(labels)]
+        if kind == 'le':
+            counts[bucket] += value
+        else:
+            total[0] += value
+    for labels, (counts, total) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, '+Inf'), counts):
+            cumulative += count
+            yield (f'{name}_bucket{format_labels((*labels, ("le", bound)))} '
+                   f'{cumulative:g}')
+        yield f'{name}_sum{format_labels(labels)} {total[0]:g}'
+        yield f'{name}_count{format_labels(labels)} {cumulative:g}'
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if settings.METRICS_DIR:
+            atexit.register(registry.flush, force=True)
+
+    def __call__(self, request):
+        query_count = [0]
+
+        def count_query(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                query_count[0] += 1
+                registry.observe('db_query_duration_seconds', (),
+                                 perf_counter() - started)
+
+        registry.inc('http_requests_in_flight')
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(count_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            registry.inc('http_requests_in_flight', amount=-1)
+        match = request.resolver_match
+        route = (('route', match.view_name if match else 'unmatched'),)
+        registry.observe('http_request_duration_seconds', route,
+                         perf_counter() - started)
+        registry.inc('http_requests_total', (
+            *route, ('method', request.method),
+            ('status', response.status_code),
+        ))
+        registry.inc('db_queries_total', route, query_count[0])
+        registry.flush()
+        return response
@@ -1,14 +1,26 @@
+from collections import Counter
+
 from django.conf import settings
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 
+from reviews.bulk import bulk_insert, set_title_genres
+from reviews.facets import apply_facet_deltas, title_facets
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 from users.validators import validate_username
 
+from .fields import BatchedSlugRelatedField
+from .timing import TimedSerializerMixin
+
+DUPLICATE_REVIEW_MESSAGE = 'Повторный отзыв запрещен.'
+
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор модели User"""
 
     class Meta:
@@ -17,7 +29,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name', 'bio', 'role')
 
 
-class RegistrationSerializer(serializers.Serializer):
+class RegistrationSerializer(TimedSerializerMixin, serializers.Serializer):
     """Сериализатор регистрации User"""
 
     username = serializers.CharField(max_length=settings.USERNAME_NAME,
@@ -26,7 +38,7 @@ class RegistrationSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=settings.EMAIL)
 
 
-class TokenSerializer(serializers.Serializer):
+class TokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Сериализатор токена"""
 
     username = serializers.CharField(max_length=settings.USERNAME_NAME,
@@ -42,7 +54,7 @@ class UserEditSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор жанров"""
 
     class Meta:
@@ -50,7 +62,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор категорий"""
 
     class Meta:
@@ -58,10 +70,10 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор записи произведения"""
 
-    genre = serializers.SlugRelatedField(
+    genre = BatchedSlugRelatedField(
         slug_field='slug',
         many=True,
         queryset=Genre.objects.all()
@@ -82,11 +94,30 @@ class TitleWriteSerializer(serializers.ModelSerializer):
             'genre',
         )
 
-
-class TitleReadSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = super().create(validated_data)
+            set_title_genres(
+                {title.pk: [genre.pk for genre in genres]}, created=True
+            )
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            if genres is not None:
+                set_title_genres(
+                    {instance.pk: [genre.pk for genre in genres]}
+                )
+            # save() после связей: сигнал сбросит кеш с новыми жанрами.
+            return super().update(instance, validated_data)
+
+
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -109,27 +140,265 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        if not self.context.get('request').method == 'POST':
-            return data
-        if Review.objects.filter(
-                author=self.context.get('request').user,
-                title=get_object_or_404(Title, id=self.context.get('view')
-                                        .kwargs.get('title_id'))).exists():
-            raise serializers.ValidationError('Повторный отзыв запрещен.')
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class BulkListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """
+    Список объектов для массовой записи. Проверки, которым нужна база,
+    выполняются в validate_batch() сразу для всего списка; ошибки
+    возвращаются списком по элементу на объект, как у many=True.
+    Для изменения (partial) validate_batch() заполняет self.instance
+    объектами в порядке элементов списка.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.error_messages['not_a_list'].format(
+                        input_type=type(data).__name__
+                    )
+                ]
+            }, code='not_a_list')
+        if not data or len(data) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Передайте от 1 до {settings.BULK_MAX_ITEMS} объектов.'
+                ]
+            }, code='bulk_size')
+        items = []
+        errors = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        self.validate_batch(items, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def validate_batch(self, items, errors):
+        """Дополняет errors ошибками, найденными по базе."""
+
+    @staticmethod
+    def check_unique(items, errors, field):
+        seen = set()
+        for item, error in zip(items, errors):
+            if item is None or field not in item:
+                continue
+            if item[field] in seen:
+                error.setdefault(field, []).append(
+                    'Значение повторяется в списке.'
+                )
+            seen.add(item[field])
+
+
+class SlugBulkListSerializer(BulkListSerializer):
+    """Жанры и категории: при создании slug свободен, при изменении занят"""
+
+    def validate_batch(self, items, errors):
+        model = self.child.Meta.model
+        self.check_unique(items, errors, 'slug')
+        existing = model.objects.in_bulk(
+            {item['slug'] for item in items if item and 'slug' in item},
+            field_name='slug'
+        )
+        for item, error in zip(items, errors):
+            if item is None:
+                continue
+            if 'slug' not in item:
+                error.setdefault('slug', []).append(
+                    'Укажите slug изменяемого объекта.'
+                )
+            elif self.partial and item['slug'] not in existing:
+                error.setdefault('slug', []).append(
+                    f'Объект со slug={item["slug"]} не найден.'
+                )
+            elif not self.partial and item['slug'] in existing:
+                error.setdefault('slug', []).append(
+                    f'Объект со slug={item["slug"]} уже существует.'
+                )
+            elif self.partial and not set(item) - {'slug'}:
+                error.setdefault(
+                    api_settings.NON_FIELD_ERRORS_KEY, []
+                ).append('Передайте хотя бы одно изменяемое поле.')
+        if self.partial:
+            self.instance = [
+                existing.get(item.get('slug')) if item else None
+                for item in items
+            ]
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objects = [model(**attrs) for attrs in validated_data]
+        model.objects.bulk_create(objects)
+        return objects
+
+    def update(self, instance, validated_data):
+        fields = set()
+        for obj, attrs in zip(instance, validated_data):
+            for field, value in attrs.items():
+                setattr(obj, field, value)
+            fields.update(attrs)
+        fields.discard('slug')
+        if fields:
+            model = self.child.Meta.model
+            model.objects.bulk_update(instance, fields)
+            # bulk_update не вызывает post_save, который отмечает
+            # изменёнными произведения жанра или категории.
+            Title.objects.filter(**{
+                f'{model._meta.model_name}__in': instance
+            }).touch()
+        return instance
+
+
+class GenreBulkSerializer(GenreSerializer):
+    """Элемент массовой записи жанров"""
+
+    class Meta(GenreSerializer.Meta):
+        list_serializer_class = SlugBulkListSerializer
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class CategoryBulkSerializer(CategorySerializer):
+    """Элемент массовой записи категорий"""
+
+    class Meta(CategorySerializer.Meta):
+        list_serializer_class = SlugBulkListSerializer
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+    """
+    Произведения: slug всех жанров и категорий списка разрешаются двумя
+    запросами, произведения и связи с жанрами вставляются bulk_create.
+    """
+
+    def validate_batch(self, items, errors):
+        valid = [item for item in items if item]
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid for slug in item.get('genre', ())},
+            field_name='slug'
+        )
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in valid if 'category' in item},
+            field_name='slug'
+        )
+        if self.partial:
+            self.check_unique(items, errors, 'id')
+            titles = Title.objects.in_bulk(
+                {item['id'] for item in valid if 'id' in item}
+            )
+        for item, error in zip(items, errors):
+            if item is None:
+                continue
+            if 'category' in item:
+                slug = item['category']
+                item['category'] = categories.get(slug)
+                if item['category'] is None:
+                    error['category'] = [self.does_not_exist(slug)]
+            if 'genre' in item:
+                missing = [slug for slug in item['genre']
+                           if slug not in genres]
+                if missing:
+                    error['genre'] = [
+                        self.does_not_exist(slug) for slug in missing
+                    ]
+                item['genre'] = [genres[slug] for slug in dict.fromkeys(
+                    item['genre']
+                ) if slug in genres]
+            if self.partial and titles.get(item.get('id')) is None:
+                error.setdefault('id', []).append(
+                    'Укажите id существующего произведения.'
+                )
+        if self.partial:
+            self.instance = [
+                titles.get(item.get('id')) if item else None
+                for item in items
+            ]
+
+    @staticmethod
+    def does_not_exist(slug):
+        return SlugRelatedField.default_error_messages[
+            'does_not_exist'
+        ].format(slug_name='slug', value=slug)
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{field: value for field, value in attrs.items()
+                     if field not in ('id', 'genre')})
+            for attrs in validated_data
+        ]
+        for title, pk in zip(titles, bulk_insert(Title, titles)):
+            title.pk = pk
+            title._state.adding = False
+        apply_facet_deltas(Counter(
+            key for title in titles
+            for key in title_facets(title.category_id, title.year)
+        ))
+        set_title_genres({
+            title.pk: [genre.pk for genre in attrs.get('genre', ())]
+            for title, attrs in zip(titles, validated_data)
+        }, created=True)
+        return titles
+
+    def update(self, instance, validated_data):
+        # Строки перечитываются под блокировкой: значения, прочитанные
+        # при проверке, могли измениться до начала транзакции.
+        locked = Title.objects.select_for_update().in_bulk(
+            [title.pk for title in instance]
+        )
+        if len(locked) < len(instance):
+            raise serializers.ValidationError([
+                {} if title.pk in locked
+                else {'id': ['Произведение удалено во время записи.']}
+                for title in instance
+            ])
+        instance = [locked[title.pk] for title in instance]
+        deltas = Counter()
+        fields = {'version', 'modified'}
+        now = timezone.now()
+        for title, attrs in zip(instance, validated_data):
+            deltas.subtract(title_facets(title.category_id, title.year))
+            for field, value in attrs.items():
+                if field not in ('id', 'genre'):
+                    setattr(title, field, value)
+                    fields.add(field)
+            deltas.update(title_facets(title.category_id, title.year))
+            title.version = F('version') + 1
+            title.modified = now
+        Title.objects.bulk_update(instance, fields)
+        apply_facet_deltas(deltas)
+        set_title_genres({
+            title.pk: [genre.pk for genre in attrs['genre']]
+            for title, attrs in zip(instance, validated_data)
+            if 'genre' in attrs
+        })
+        return instance
+
+
+class TitleBulkSerializer(TitleWriteSerializer):
+    """Элемент массовой записи произведений; при изменении нужен id"""
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta(TitleWriteSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
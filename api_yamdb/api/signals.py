@@ -0,0 +1,67 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, Genre, Review, Title, TitleGenre,
+                            titles_recalculated)
+from users.models import User
+
+from .authentication import ROLE_CLAIMS, revoke_user_tokens
+from .cache import bump_versions
+
+TOKEN_FIELDS = (*ROLE_CLAIMS, 'is_active')
+
+
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_versions('categories', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    bump_versions('genres', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_versions('titles:list', f'titles:{instance.pk}')
+
+
+@receiver((post_save, post_delete), sender=TitleGenre)
+@receiver((post_save, post_delete), sender=Review)
+def invalidate_title_of(sender, instance, **kwargs):
+    bump_versions('titles:list', f'titles:{instance.title_id}')
+
+
+@receiver(titles_recalculated)
+def invalidate_titles(sender, **kwargs):
+    bump_versions('titles')
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_versions('titles:list', f'titles:{instance.pk}')
+    elif pk_set:
+        bump_versions('titles:list', *(f'titles:{pk}' for pk in pk_set))
+    else:
+        bump_versions('titles')
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_role_change(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    saved = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+    if saved is not None and any(
+        saved[field] != getattr(instance, field) for field in TOKEN_FIELDS
+    ):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,117 @@
+"""
+Замеры запроса: число SQL-запросов, время в базе, в сериализаторах и
+во view.
+
+Доля замеряемых запросов задаётся REQUEST_TIMING_SAMPLE_RATE: 0
+выключает замеры, 1 включает для всех запросов. Результат отдаётся
+заголовком Server-Timing и строкой лога ``api.timing``.
+"""
+
+import logging
+import random
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+@dataclass
+class RequestTiming:
+    queries: int = 0
+    db: float = 0.0
+    serializer: float = 0.0
+    view: float = 0.0
+    serializer_depth: int = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка execute_wrapper для всех соединений запроса."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += perf_counter() - started
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serializer;dur={self.serializer * 1000:.2f}',
+            f'view;dur={self.view * 1000:.2f}',
+        ))
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 2),
+            'serializer_ms': round(self.serializer * 1000, 2),
+            'view_ms': round(self.view * 1000, 2),
+        }
+
+
+@contextmanager
+def serializer_timer():
+    """Время внешнего сериализатора; вложенные уже учтены в нём."""
+    timing = current_timing.get()
+    if timing is None or timing.serializer_depth:
+        yield
+        return
+    timing.serializer_depth += 1
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timing.serializer_depth -= 1
+        timing.serializer += perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """Учитывает валидацию и представление объекта во времени запроса."""
+
+    def is_valid(self, *args, **kwargs):
+        with serializer_timer():
+            return super().is_valid(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class RequestTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        timing.view = perf_counter() - started
+        response['Server-Timing'] = timing.server_timing()
+        data = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timing.as_dict(),
+        }
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in data.items()),
+            extra={'timing': data}
+        )
+        return response
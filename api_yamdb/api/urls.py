@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_token,
-                    register_user)
+                    ReviewViewSet, TitleViewSet, UserViewSet, export_data,
+                    get_token, register_user)
 
 app_name = 'api'
 
@@ -26,4 +26,6 @@ urlpatterns_auth = [
 urlpatterns = [
     path('v1/', include(routerv1.urls)),
     path('v1/auth/', include(urlpatterns_auth)),
+    path('v1/export/<slug:dataset>.<slug:file_format>', export_data,
+         name='export_data'),
 ]
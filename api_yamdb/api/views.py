@@ -1,26 +1,38 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import (HttpResponse, HttpResponseForbidden,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Genre, Review, Title
+from emails.queue import get_email_queue
+from reviews.export import CONTENT_TYPES, DATASETS, export_lines
+from reviews.facets import filtered_facets, stored_facets
+from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
-from .filters import TitleFilter
+from .authentication import RoleAccessToken
+from .bulk import BulkWriteMixin
+from .cache import CachedListMixin, CachedRetrieveMixin
+from .conditional import conditional_response, title_validators
+from .fast import FastListMixin
+from .filters import IndexedSearchFilter, TitleFilter
+from .metrics import registry, render
+from .pagination import PageNumberOrKeysetPagination
 from .permissions import (IsAdmin, IsAdminModeratorAuthorOrReadOnly,
                           IsAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, RegistrationSerializer,
-                          ReviewSerializer, TitleReadSerializer,
+from .serializers import (DUPLICATE_REVIEW_MESSAGE, CategoryBulkSerializer,
+                          CategorySerializer, CommentSerializer,
+                          GenreBulkSerializer, GenreSerializer,
+                          RegistrationSerializer, ReviewSerializer,
+                          TitleBulkSerializer, TitleReadSerializer,
                           TitleWriteSerializer, TokenSerializer,
                           UserEditSerializer, UserSerializer)
 
@@ -37,12 +49,11 @@ def register_user(request):
     except IntegrityError:
         raise ValidationError('username или email заняты!')
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    get_email_queue().enqueue(
         subject='Регистрация в проекте YaMDb.',
         message=f'Ваш код подтверждения: {confirmation_code}',
         from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[user.email],
-        fail_silently=False,
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -59,21 +70,55 @@ def get_token(request):
     )
     if default_token_generator.check_token(
             user, serializer.validated_data['confirmation_code']):
-        token = AccessToken.for_user(user)
-        return Response(
-            {'access': str(token.access_token)}, status=status.HTTP_200_OK
-        )
+        token = RoleAccessToken.for_user(user)
+        return Response({'access': str(token)}, status=status.HTTP_200_OK)
     raise ValidationError('Invalid confirmation code.')
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_data(request, dataset, file_format):
+    """Потоковая выгрузка набора данных для администратора"""
+
+    if dataset not in DATASETS or file_format not in CONTENT_TYPES:
+        raise NotFound('Неизвестный набор данных или формат.')
+    response = StreamingHttpResponse(
+        export_lines(dataset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{file_format}"'
+    )
+    return response
+
+
+def metrics(request):
+    """Метрики в формате Prometheus для адресов из METRICS_ALLOWED_IPS"""
+
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    values = registry.collect()
+    hits = values.get(('api_cache_requests_total', (('result', 'hit'),)), 0)
+    misses = values.get(
+        ('api_cache_requests_total', (('result', 'miss'),)), 0
+    )
+    return HttpResponse(render(values, gauges=(
+        ('api_cache_hit_ratio', 'Share of response cache hits.',
+         hits / (hits + misses) if hits + misses else 0),
+        ('email_queue_depth', 'Emails waiting to be sent.',
+         get_email_queue().depth()),
+    )), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class ListCreateDestroyGenericViewSet(
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet
 ):
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (IndexedSearchFilter,)
     search_fields = ('name',)
+    search_key_field = 'slug'
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAdminOrReadOnly
@@ -88,8 +133,9 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin, IsAuthenticated)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (IndexedSearchFilter,)
     search_fields = ('username',)
+    search_key_field = 'username'
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
 
@@ -100,7 +146,8 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer_class=UserEditSerializer,
     )
     def get_edit_user(self, request):
-        user = request.user
+        # request.user может быть собран из токена, профиль читаем из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
         serializer = self.get_serializer(user)
 
         if request.method == 'PATCH':
@@ -112,7 +159,8 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(FastListMixin, viewsets.ModelViewSet):
+    pagination_class = PageNumberOrKeysetPagination
     serializer_class = ReviewSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
@@ -120,18 +168,43 @@ class ReviewViewSet(viewsets.ModelViewSet):
     )
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all()
+        # Отзыв чужого произведения не найдётся, а существование
+        # произведения для списка проверяет title_validators.
+        return Review.objects.select_related('author').filter(
+            title_id=self.kwargs.get('title_id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, title_validators(kwargs['title_id'], 'reviews'),
+            super().list, *args, **kwargs
+        )
 
     def perform_create(self, serializer):
         title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        # Повторный отзыв отсекает ограничение unique_review в базе;
+        # остальные нарушения целостности не выдаются за повтор.
+        try:
+            serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title=title
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+            })
+
+
+class CommentViewSet(FastListMixin, viewsets.ModelViewSet):
+    pagination_class = PageNumberOrKeysetPagination
     serializer_class = CommentSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
@@ -139,34 +212,92 @@ class CommentViewSet(viewsets.ModelViewSet):
     )
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        """Отзыв из URL, если он относится к произведению из URL."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        queryset = Comment.objects.select_related('author')
+        if self.action == 'list':
+            # Для несуществующего отзыва нужен 404, а не пустой список.
+            return queryset.filter(review=self.get_review())
+        return queryset.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        )
 
     def perform_create(self, serializer):
         review = self.get_review()
         serializer.save(author=self.request.user, review=review)
 
 
-class CategoryViewSet(ListCreateDestroyGenericViewSet):
+class CategoryViewSet(BulkWriteMixin, CachedListMixin,
+                      ListCreateDestroyGenericViewSet):
+    cache_resource = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
+    bulk_cache_versions = ('categories', 'titles')
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+class TitleViewSet(BulkWriteMixin, CachedListMixin, CachedRetrieveMixin,
+                   FastListMixin, viewsets.ModelViewSet):
+    cache_resource = 'titles'
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('name')
     permission_classes = (IsAdminOrReadOnly,)
     filterset_class = TitleFilter
+    bulk_serializer_class = TitleBulkSerializer
+    bulk_cache_versions = ('titles',)
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request, title_validators(kwargs['pk'], 'detail'),
+            super().retrieve, *args, **kwargs
+        )
+
+    def get_bulk_response_data(self, serializer, titles):
+        saved = self.get_queryset().in_bulk([title.pk for title in titles])
+        return TitleReadSerializer(
+            [saved[title.pk] for title in titles], many=True
+        ).data
+
+    @action(detail=False)
+    def facets(self, request):
+        """
+        Число произведений по жанрам, категориям и десятилетиям для
+        текущих фильтров. Без фильтров читаются хранимые счётчики.
+        """
+        return self.cached_response(
+            self.get_facets, (f'{self.cache_resource}:list',), request
+        )
 
-class GenreViewSet(ListCreateDestroyGenericViewSet):
+    def get_facets(self, request):
+        if any(
+            request.query_params.get(name)
+            for name in self.filterset_class.base_filters
+            if name != 'ordering'
+        ):
+            return Response(filtered_facets(
+                self.filter_queryset(self.get_queryset())
+            ))
+        return Response(stored_facets())
+
+
+class GenreViewSet(BulkWriteMixin, CachedListMixin,
+                   ListCreateDestroyGenericViewSet):
+    cache_resource = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
+    bulk_cache_versions = ('genres', 'titles')
@@ -0,0 +1,92 @@
+"""
+Пул соединений внутри процесса.
+
+Django открывает соединение на поток и закрывает его по истечении
+CONN_MAX_AGE или при ошибке. Бэкенды с PooledConnectionMixin вместо
+закрытия возвращают соединение в пул, а следующий connect() забирает
+его оттуда, не устанавливая новое. Размер пула задаётся
+``OPTIONS['pool_size']``; 0 отключает пул.
+"""
+
+import queue
+import threading
+
+POOL_SIZE = 5
+
+
+class PooledConnectionMixin:
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def get_connection_params(self):
+        # settings_dict общий для потоков: ключи пула убираются из
+        # собранных параметров, а не из OPTIONS.
+        options = {**self.settings_dict['OPTIONS']}
+        self.pool_size = options.pop('pool_size', POOL_SIZE)
+        params = super().get_connection_params()
+        params.pop('pool_size', None)
+        return params
+
+    def get_pool(self):
+        key = (self.alias, str(self.settings_dict['NAME']))
+        with self._pools_lock:
+            if key not in self._pools:
+                self._pools[key] = queue.LifoQueue()
+            return self._pools[key]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        while True:
+            try:
+                connection = pool.get_nowait()
+            except queue.Empty:
+                return self.configure_connection(
+                    super().get_new_connection(conn_params)
+                )
+            if self.is_reusable(connection):
+                return connection
+            self.discard(connection)
+
+    def configure_connection(self, connection):
+        """Настройка нового соединения, которую сохраняет пул."""
+        return connection
+
+    def is_reusable(self, connection):
+        try:
+            connection.cursor().execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = self.get_pool()
+        if not self.pool_size or pool.qsize() >= self.pool_size:
+            return super()._close()
+        try:
+            # Незавершённая транзакция не должна достаться
+            # следующему владельцу соединения.
+            self.connection.rollback()
+        except Exception:
+            return super()._close()
+        pool.put(self.connection)
+
+    @staticmethod
+    def discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @classmethod
+    def close_pools(cls):
+        """Закрывает соединения, ожидающие в пулах."""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+        for pool in pools:
+            while True:
+                try:
+                    cls.discard(pool.get_nowait())
+                except queue.Empty:
+                    break
@@ -0,0 +1,100 @@
+"""
+Чтение с реплик для безопасных запросов.
+
+ReplicaRoutingMiddleware включает чтение с реплик на время GET/HEAD/
+OPTIONS-запроса, остальной код (команды, фоновые потоки, изменяющие
+запросы) читает с основной базы. Клиент, который только что изменил
+данные, ещё REPLICA_PIN_SECONDS читает с основной базы, чтобы видеть
+свои изменения, пока реплика догоняет: его узнают по заголовку
+Authorization (метка в кеше REPLICA_PIN_CACHE_ALIAS) и по cookie.
+Если работает несколько процессов, кеш меток должен быть общим для них.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'pin_primary'
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    token = replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        # DatabaseCache: метки и отозванные токены нельзя читать с
+        # отстающей реплики.
+        if (not replicas or not replica_reads.get()
+                or model._meta.app_label == 'django_cache'
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.md5(authorization.encode()).hexdigest()
+    return f'replica-pin:{digest}'
+
+
+def get_pins():
+    return caches[settings.REPLICA_PIN_CACHE_ALIAS]
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = pin_key(request)
+    return key is not None and get_pins().get(key) is not None
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        safe = request.method in ('GET', 'HEAD', 'OPTIONS')
+        with use_replicas(safe and not is_pinned(request)):
+            response = self.get_response(request)
+        if not safe and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    @staticmethod
+    def pin(request, response):
+        timeout = settings.REPLICA_PIN_SECONDS
+        key = pin_key(request)
+        if key is not None:
+            get_pins().set(key, True, timeout)
+        response.set_cookie(PIN_COOKIE, '1', max_age=timeout, httponly=True)
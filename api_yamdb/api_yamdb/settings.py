@@ -1,4 +1,5 @@
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
@@ -29,12 +30,16 @@ INSTALLED_APPS = [
     'users',
     'api',
     'reviews',
+    'emails',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api_yamdb.db.router.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -65,16 +70,87 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# DB_ENGINE: sqlite3 или postgresql, бэкенды с пулом из api_yamdb.db.
+# DB_CONN_MAX_AGE — сколько секунд держать соединение потока открытым,
+# DB_POOL_SIZE — сколько закрытых соединений процесс хранит для повторного
+# использования (0 отключает пул).
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite3')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'ENGINE': f'api_yamdb.db.{DB_ENGINE}',
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'OPTIONS': {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        },
     }
 }
 
+# DB_REPLICAS — реплики через запятую: файлы для SQLite, хосты для
+# PostgreSQL. Безопасные запросы читают с них, см. api_yamdb.db.router.
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME' if DB_ENGINE == 'sqlite3' else 'HOST': replica.strip(),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+REPLICA_PIN_SECONDS: int = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+# Кеш меток чтения с основной базы, общий для всех процессов.
+REPLICA_PIN_CACHE_ALIAS = 'replica-pins'
+
+DATABASE_ROUTERS = ['api_yamdb.db.router.ReplicaRouter']
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Cache
+
+# Для общего между процессами кеша ответов замените backend 'api' на
+# django.core.cache.backends.filebased.FileBasedCache с LOCATION-каталогом.
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+    },
+    # Отозванные токены должны видеть все процессы и храниться до
+    # истечения срока: кеш в общем каталоге без вытеснения записей.
+    'jwt-denylist': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'jwt-denylist'),
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+    },
+    # Метки чтения с основной базы живут секунды; вытеснение метки лишь
+    # раньше возвращает клиента на реплику.
+    'replica-pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'replica-pins'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT: int = 300
+
+# None — FTS5 на SQLite, поиск по вхождению на остальных базах
+TITLE_SEARCH_BACKEND = None
+NGRAM_SEARCH_BACKEND = None
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -120,9 +196,49 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'noreply@yamdb.ru'
 
+# ThreadEmailQueue, OutboxEmailQueue или SyncEmailQueue из emails.queue
+EMAIL_QUEUE_BACKEND = 'emails.queue.ThreadEmailQueue'
+EMAIL_QUEUE_WORKERS: int = 2
+EMAIL_QUEUE_MAX_ATTEMPTS: int = 5
+EMAIL_QUEUE_RETRY_DELAY: float = 1.0
+
+# Доля запросов, для которых замеряются SQL, сериализаторы и view
+# (заголовок Server-Timing и лог api.timing); 0 — выключено.
+REQUEST_TIMING_SAMPLE_RATE: float = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', 0)
+)
+
+# /metrics отвечает только этим адресам. METRICS_DIR — общий каталог
+# процессов WSGI-сервера для суммирования метрик, см. api.metrics.
+METRICS_ALLOWED_IPS = os.getenv(
+    'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+).split(',')
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL: float = 1.0
+
+# Списки произведений, отзывов и комментариев собираются из values_list
+# без экземпляров моделей и сериализаторов (api.fast).
+FAST_LIST_SERIALIZERS: bool = os.getenv(
+    'FAST_LIST_SERIALIZERS', ''
+).lower() in ('1', 'true', 'yes')
+
+# Наибольшее число объектов в одном запросе к .../bulk/.
+BULK_MAX_ITEMS: int = int(os.getenv('BULK_MAX_ITEMS', 1000))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
 
     'DEFAULT_PERMISSION_CLASSES': [
@@ -142,6 +258,10 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ('Bearer',),
 }
 
+# Список отозванных токенов. Кеш должен быть общим для всех процессов и
+# серверов и не вытеснять записи, иначе отозванный токен снова примется.
+JWT_DENYLIST_CACHE_ALIAS = 'jwt-denylist'
+
 CUT_TEXT: int = 30
 
 USERNAME_NAME: int = 150
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import OutboxEmail
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'recipients', 'status', 'attempts',
+                    'created', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipients',)
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from emails.queue import OutboxEmailQueue, get_email_queue
+
+
+class Command(BaseCommand):
+    help = 'Send pending emails stored in the outbox table'
+
+    def handle(self, *args, **kwargs):
+        email_queue = get_email_queue()
+        if not isinstance(email_queue, OutboxEmailQueue):
+            self.stdout.write(self.style.WARNING(
+                'EMAIL_QUEUE_BACKEND does not use the outbox table'
+            ))
+            return
+        sent = email_queue.send_pending()
+        self.stdout.write(self.style.SUCCESS(f'Emails sent: {sent}'))
@@ -0,0 +1,281 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache
+from time import monotonic
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api.metrics import registry
+from emails.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Письмо, забранное упавшим процессом, снова отправляется через это время.
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+@dataclass
+class QueuedEmail:
+    subject: str
+    message: str
+    from_email: str
+    recipient_list: list
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=monotonic)
+
+
+class ThreadEmailQueue:
+    """
+    Очередь писем, которую разбирают фоновые потоки процесса.
+
+    Неудачная отправка повторяется с экспоненциальной задержкой
+    до ``max_attempts`` попыток.
+    """
+
+    def __init__(self, workers, max_attempts, retry_delay):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._retrying = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def enqueue(self, subject, message, from_email, recipient_list):
+        self.put(QueuedEmail(subject, message, from_email,
+                             list(recipient_list)))
+
+    def put(self, item):
+        self.start()
+        self._queue.put(item)
+
+    def start(self):
+        if self._threads:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self.work, name='email-queue', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self.process(item)
+            except Exception:
+                logger.exception('Email queue worker failed')
+            finally:
+                self._queue.task_done()
+
+    def process(self, item):
+        item.attempts += 1
+        try:
+            send_mail(item.subject, item.message, item.from_email,
+                      item.recipient_list, fail_silently=False)
+        except Exception as error:
+            self.on_error(item, error)
+        else:
+            self.on_sent(item)
+
+    def on_sent(self, item):
+        self.record_sent(monotonic() - item.enqueued_at)
+
+    def on_error(self, item, error):
+        if item.attempts >= self.max_attempts:
+            logger.error('Email to %s dropped after %s attempts: %s',
+                         item.recipient_list, item.attempts, error)
+            self.record_failed()
+            return
+        self.record_retried()
+        with self._lock:
+            self._retrying += 1
+        timer = threading.Timer(
+            self.backoff(item.attempts), self.retry, (item,)
+        )
+        timer.daemon = True
+        timer.start()
+
+    def record_sent(self, latency):
+        """Учитывает отправку в stats() и в метриках /metrics."""
+        with self._lock:
+            self.sent += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+        registry.inc('emails_total', (('result', 'sent'),))
+        registry.observe('email_delivery_seconds', (), latency)
+
+    def record_failed(self):
+        with self._lock:
+            self.failed += 1
+        registry.inc('emails_total', (('result', 'failed'),))
+
+    def record_retried(self):
+        with self._lock:
+            self.retried += 1
+        registry.inc('emails_total', (('result', 'retried'),))
+
+    def retry(self, item):
+        with self._lock:
+            self._retrying -= 1
+        self.put(item)
+
+    def backoff(self, attempts):
+        return self.retry_delay * 2 ** (attempts - 1)
+
+    def depth(self):
+        return self._queue.qsize() + self._retrying
+
+    def join(self):
+        """Ждёт, пока потоки разберут всё, что уже стоит в очереди."""
+        self._queue.join()
+
+    def stats(self):
+        depth = self.depth()
+        with self._lock:
+            return {
+                'depth': depth,
+                'sent': self.sent,
+                'failed': self.failed,
+                'retried': self.retried,
+                'latency_avg': (
+                    self.latency_total / self.sent if self.sent else 0.0
+                ),
+                'latency_max': self.latency_max,
+            }
+
+
+class SyncEmailQueue(ThreadEmailQueue):
+    """Отправка в потоке запроса: для разработки и тестов."""
+
+    def put(self, item):
+        self.process(item)
+
+
+class OutboxEmailQueue(ThreadEmailQueue):
+    """
+    Очередь с записью писем в таблицу OutboxEmail.
+
+    Письмо сохраняется в той же транзакции, что и запрос, и передаётся
+    потокам после коммита. Письма, не отправленные из-за перезапуска
+    процесса, досылает команда ``send_queued_emails``.
+
+    Перед отправкой письмо забирается одним UPDATE со статусом
+    SENDING: отправляет только тот поток или процесс, чей UPDATE
+    изменил строку.
+    """
+
+    def enqueue(self, subject, message, from_email, recipient_list):
+        email = OutboxEmail.objects.create(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipients=','.join(recipient_list),
+        )
+        transaction.on_commit(lambda: self.put(email.pk))
+
+    def process(self, pk):
+        close_old_connections()
+        try:
+            email = self.claim(pk, Q(status=OutboxEmail.PENDING))
+            if email is not None:
+                self.deliver(email, schedule_retry=True)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def claim(pk, condition):
+        """Забирает письмо, если оно ещё подходит под condition."""
+        claimed = OutboxEmail.objects.filter(condition, pk=pk).update(
+            status=OutboxEmail.SENDING,
+            next_attempt_at=timezone.now() + CLAIM_TIMEOUT,
+        )
+        return OutboxEmail.objects.get(pk=pk) if claimed else None
+
+    @staticmethod
+    def due():
+        """Ожидающие письма, чья попытка подошла, и брошенные отправки."""
+        return Q(
+            status__in=(OutboxEmail.PENDING, OutboxEmail.SENDING),
+            next_attempt_at__lte=timezone.now(),
+        )
+
+    def deliver(self, email, schedule_retry=False):
+        email.attempts += 1
+        try:
+            send_mail(email.subject, email.message, email.from_email,
+                      email.recipient_list, fail_silently=False)
+        except Exception as error:
+            email.last_error = str(error)
+            if email.attempts >= self.max_attempts:
+                email.status = OutboxEmail.FAILED
+                email.save()
+                self.record_failed()
+                return False
+            delay = self.backoff(email.attempts)
+            email.status = OutboxEmail.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+            email.save()
+            self.record_retried()
+            if schedule_retry:
+                with self._lock:
+                    self._retrying += 1
+                timer = threading.Timer(delay, self.retry, (email.pk,))
+                timer.daemon = True
+                timer.start()
+            return False
+        email.status = OutboxEmail.SENT
+        email.sent_at = timezone.now()
+        email.save()
+        self.record_sent((email.sent_at - email.created).total_seconds())
+        return True
+
+    def send_pending(self):
+        """Синхронно отправляет письма, чья очередь попытки подошла."""
+        pks = list(
+            OutboxEmail.objects.filter(self.due()).values_list('pk', flat=True)
+        )
+        sent = 0
+        for pk in pks:
+            email = self.claim(pk, self.due())
+            if email is not None:
+                sent += self.deliver(email)
+        return sent
+
+    def depth(self):
+        return OutboxEmail.objects.filter(
+            status__in=(OutboxEmail.PENDING, OutboxEmail.SENDING)
+        ).count()
+
+
+@lru_cache(maxsize=None)
+def get_email_queue():
+    queue_class = import_string(settings.EMAIL_QUEUE_BACKEND)
+    return queue_class(
+        workers=settings.EMAIL_QUEUE_WORKERS,
+        max_attempts=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        retry_delay=settings.EMAIL_QUEUE_RETRY_DELAY,
+    )
+
+
+@receiver(setting_changed)
+def reset_email_queue(setting, **kwargs):
+    if setting.startswith('EMAIL_QUEUE_'):
+        get_email_queue.cache_clear()
@@ -0,0 +1,71 @@
+from collections import Counter
+from itertools import islice
+
+from django.db import transaction
+
+from reviews.facets import apply_facet_deltas
+from reviews.models import FacetCount, Title, TitleGenre
+
+
+def bulk_insert(model, objects, batch_size=None):
+    """
+    Вставляет объекты пачками и возвращает pk вставленных строк.
+
+    Вызывается в транзакции: если база не возвращает pk из bulk_create
+    (SQLite), они читаются как последние строки таблицы.
+    """
+    pks = []
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            break
+        created = model.objects.bulk_create(batch, batch_size=batch_size)
+        pks.extend(obj.pk for obj in created)
+    if None not in pks:
+        return pks
+    return list(
+        model.objects.order_by('-pk').values_list('pk', flat=True)[:len(pks)]
+    )[::-1]
+
+
+def set_title_genres(genres, created=False):
+    """
+    Заменяет жанры произведений: ``{title_id: [genre_id, ...]}``.
+
+    Новые связи вставляются одним bulk_create без post_save, поэтому
+    счётчики фасетов и версии произведений для них обновляются здесь.
+    Лишние связи удаляются через delete(): счётчики, версии и кеш
+    ответов для них обновляют сигналы post_delete. Если ``created``,
+    у произведений ещё нет жанров и связи не читаются.
+    Возвращает id произведений, жанры которых изменились.
+    """
+    wanted = {
+        title_id: dict.fromkeys(genre_ids)
+        for title_id, genre_ids in genres.items()
+    }
+    stale = []
+    if not created:
+        for pk, title_id, genre_id in TitleGenre.objects.filter(
+            title_id__in=wanted
+        ).values_list('pk', 'title_id', 'genre_id'):
+            if genre_id in wanted[title_id]:
+                del wanted[title_id][genre_id]
+            else:
+                stale.append((pk, title_id))
+    links = [
+        TitleGenre(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_ids in wanted.items()
+        for genre_id in genre_ids
+    ]
+    linked = {link.title_id for link in links}
+    with transaction.atomic():
+        if stale:
+            TitleGenre.objects.filter(pk__in=[pk for pk, _ in stale]).delete()
+        TitleGenre.objects.bulk_create(links)
+        apply_facet_deltas(Counter(
+            (FacetCount.GENRE, link.genre_id) for link in links
+        ))
+        if linked and not created:
+            Title.objects.filter(pk__in=linked).touch()
+    return linked | {title_id for _, title_id in stale}
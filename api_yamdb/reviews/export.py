@@ -0,0 +1,83 @@
+"""Выгрузка данных в файлы, которые читает команда load_cvs_data."""
+
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+FORMATS = tuple(CONTENT_TYPES)
+
+DATASETS = {
+    'users': (User, ('id', 'username', 'email', 'role', 'bio',
+                     'first_name', 'last_name')),
+    'category': (Category, ('id', 'name', 'slug')),
+    'genre': (Genre, ('id', 'name', 'slug')),
+    'titles': (Title, ('id', 'name', 'year', 'description', 'category')),
+    'genre_title': (TitleGenre, ('id', 'title_id', 'genre_id')),
+    'review': (Review, ('id', 'title_id', 'text', 'author', 'score',
+                        'pub_date')),
+    'comments': (Comment, ('id', 'review_id', 'text', 'author',
+                           'pub_date')),
+}
+
+RENAMED_COLUMNS = {
+    'author': 'author_id',
+    'category': 'category_id',
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_lines(dataset, file_format, chunk_size=2000):
+    """
+    Построчно отдаёт набор данных в формате csv или jsonl.
+
+    Строки читаются из базы через iterator(), поэтому память
+    не растёт с размером таблицы.
+    """
+    model, columns = DATASETS[dataset]
+    rows = model.objects.order_by('pk').values_list(
+        *(RENAMED_COLUMNS.get(column, column) for column in columns)
+    ).iterator(chunk_size=chunk_size)
+    if file_format == 'jsonl':
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(columns, row))) + '\n'
+        return
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in row])
+
+
+def read_rows(f, file_format):
+    """Читает строки файла выгрузки: (номер строки, словарь значений)."""
+    if file_format == 'jsonl':
+        for line_num, line in enumerate(f, 1):
+            if line.strip():
+                yield line_num, json.loads(line)
+        return
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
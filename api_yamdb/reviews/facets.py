@@ -0,0 +1,140 @@
+"""
+Счётчики фасетов каталога: число произведений по жанрам, категориям и
+десятилетиям выхода.
+
+Счётчики хранятся в FacetCount и сдвигаются сигналами (reviews.signals)
+при изменении произведений и их жанров, поэтому фасеты всего каталога
+читаются без GROUP BY по произведениям. Массовые загрузки в обход
+сигналов (load_cvs_data, seed_dataset) пересобирают счётчики через
+rebuild_facets(); то же делает команда rebuild_facets.
+"""
+
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import (Case, Count, F, OuterRef, Q, Subquery, Value,
+                              When)
+
+from reviews.models import (Category, FacetCount, Genre, Title,
+                            titles_recalculated)
+
+YEAR_BUCKET = 10
+
+
+def year_bucket(year):
+    """Первый год десятилетия, к которому относится год выхода."""
+    return year - year % YEAR_BUCKET
+
+
+def title_facets(category_id, year):
+    """Ключи счётчиков, в которые входит произведение без учёта жанров."""
+    keys = [(FacetCount.YEAR, year_bucket(year))]
+    if category_id is not None:
+        keys.append((FacetCount.CATEGORY, category_id))
+    return keys
+
+
+def apply_facet_deltas(deltas):
+    """Атомарно сдвигает счётчики: ``{(facet, key): delta}``."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    whens = [
+        When(Q(facet=facet, key=key), then=Value(delta))
+        for (facet, key), delta in deltas.items()
+    ]
+    with transaction.atomic():
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=facet, key=key) for facet, key in deltas],
+            ignore_conflicts=True,
+        )
+        FacetCount.objects.filter(
+            reduce(or_, (when.condition for when in whens))
+        ).update(count=F('count') + Case(*whens, default=Value(0)))
+
+
+def rebuild_facets(apps=global_apps):
+    """Пересчитывает все счётчики по таблицам произведений."""
+    facet_model = apps.get_model('reviews', 'FacetCount')
+    title_model = apps.get_model('reviews', 'Title')
+    title_genre_model = apps.get_model('reviews', 'TitleGenre')
+    counts = Counter()
+    for category, total in title_model.objects.exclude(
+        category=None
+    ).values_list('category').annotate(Count('pk')).order_by():
+        counts[FacetCount.CATEGORY, category] = total
+    for genre, total in title_genre_model.objects.values_list(
+        'genre'
+    ).annotate(Count('title', distinct=True)).order_by():
+        counts[FacetCount.GENRE, genre] = total
+    for year, total in title_model.objects.values_list(
+        'year'
+    ).annotate(Count('pk')).order_by():
+        counts[FacetCount.YEAR, year_bucket(year)] += total
+    with transaction.atomic():
+        facet_model.objects.all().delete()
+        facet_model.objects.bulk_create(
+            facet_model(facet=facet, key=key, count=count)
+            for (facet, key), count in counts.items()
+        )
+    titles_recalculated.send(sender=Title)
+    return len(counts)
+
+
+def named_facet(queryset):
+    return [
+        {'slug': slug, 'name': name, 'count': count}
+        for slug, name, count in queryset.filter(count__gt=0).order_by(
+            'name', 'slug'
+        ).values_list('slug', 'name', 'count')
+    ]
+
+
+def year_facet(rows):
+    counts = Counter()
+    for year, count in rows:
+        counts[year_bucket(year)] += count
+    return [
+        {'from': bucket, 'to': bucket + YEAR_BUCKET - 1, 'count': count}
+        for bucket, count in sorted(counts.items()) if count > 0
+    ]
+
+
+def stored_facets():
+    """Фасеты всего каталога из хранимых счётчиков."""
+
+    def stored_count(facet):
+        return Subquery(FacetCount.objects.filter(
+            facet=facet, key=OuterRef('pk')
+        ).values('count'))
+
+    return {
+        'genre': named_facet(Genre.objects.annotate(
+            count=stored_count(FacetCount.GENRE)
+        )),
+        'category': named_facet(Category.objects.annotate(
+            count=stored_count(FacetCount.CATEGORY)
+        )),
+        'year': year_facet(FacetCount.objects.filter(
+            facet=FacetCount.YEAR
+        ).values_list('key', 'count')),
+    }
+
+
+def filtered_facets(queryset):
+    """Фасеты произведений из отфильтрованного queryset."""
+    titles = Title.objects.filter(pk__in=queryset.order_by().values('pk'))
+    return {
+        'genre': named_facet(Genre.objects.filter(
+            title__in=titles
+        ).annotate(count=Count('title', distinct=True))),
+        'category': named_facet(Category.objects.filter(
+            titles__in=titles
+        ).annotate(count=Count('titles'))),
+        'year': year_facet(
+            titles.values_list('year').annotate(Count('pk')).order_by()
+        ),
+    }
@@ -0,0 +1,100 @@
+from itertools import islice
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+SORT_MARKERS = ('TEMP B-TREE FOR ORDER BY', 'Sort')
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway dataset inside a rolled back transaction and '
+        'check that sorted review/comment listings are served by indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            self.seed(options['titles'], options['users'],
+                      options['comments'])
+            title = Title.objects.order_by('pk').last()
+            review = Review.objects.order_by('pk').last()
+            failed = [
+                label for label, queryset in (
+                    ('reviews', title.reviews.all()),
+                    ('comments', review.comments.all()),
+                ) if not self.measure(label, queryset, options['repeat'])
+            ]
+            transaction.set_rollback(True)
+        if failed:
+            raise CommandError(f'Sort step found for: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS(
+            'Sorted listings are served from indexes'
+        ))
+
+    def bulk_insert(self, model, objects):
+        objects = iter(objects)
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def seed(self, titles, users, comments):
+        started = perf_counter()
+        self.bulk_insert(User, (
+            User(username=f'bench_{i}', email=f'bench_{i}@yamdb.fake')
+            for i in range(users)
+        ))
+        self.bulk_insert(Title, (
+            Title(name=f'Bench title {i}', year=2000) for i in range(titles)
+        ))
+        user_ids = list(
+            User.objects.filter(username__startswith='bench_')
+            .values_list('pk', flat=True)
+        )
+        title_ids = list(
+            Title.objects.filter(name__startswith='Bench title ')
+            .values_list('pk', flat=True)
+        )
+        self.bulk_insert(Review, (
+            Review(title_id=title_id, author_id=user_id, text='bench',
+                   score=user_id % 10 + 1)
+            for user_id in user_ids for title_id in title_ids
+        ))
+        review_ids = list(
+            Review.objects.filter(title_id__in=title_ids[-1:])
+            .values_list('pk', flat=True)
+        )
+        self.bulk_insert(Comment, (
+            Comment(review_id=review_ids[i % len(review_ids)],
+                    author_id=user_ids[i % len(user_ids)], text='bench')
+            for i in range(comments)
+        ))
+        self.stdout.write(
+            f'Seeded {len(title_ids) * len(user_ids)} reviews and '
+            f'{comments} comments in {perf_counter() - started:.1f}s'
+        )
+
+    def measure(self, label, queryset, repeat):
+        page = queryset.order_by('pub_date')
+        plan = page.explain()
+        started = perf_counter()
+        for _ in range(repeat):
+            list(page[:5])
+            list(page[1000:1005])
+        elapsed = (perf_counter() - started) / repeat * 1000
+        self.stdout.write(f'{label}: {elapsed:.2f} ms per request pair')
+        self.stdout.write(plan)
+        return not any(marker in plan for marker in SORT_MARKERS)
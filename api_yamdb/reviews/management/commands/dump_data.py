@@ -0,0 +1,37 @@
+import os
+
+from django.core.management.base import BaseCommand
+from reviews.export import DATASETS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Dump the catalogue into files readable by load_cvs_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir')
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', dest='file_format'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched from the database per round trip.'
+        )
+        parser.add_argument(
+            '--dataset', action='append', choices=DATASETS,
+            dest='datasets', help='Dump only these datasets.'
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for dataset in options['datasets'] or DATASETS:
+            path = os.path.join(
+                options['output_dir'], f'{dataset}.{options["file_format"]}'
+            )
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(export_lines(
+                    dataset, options['file_format'], options['chunk_size']
+                ))
+            if options['verbosity']:
+                self.stdout.write(f'{path} written')
+
+        self.stdout.write(self.style.SUCCESS('Data dumped successfully'))
@@ -1,38 +1,271 @@
-import csv
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
 
-from django.core.management.base import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
-from users.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Index
+from reviews.export import DATASETS, FORMATS, RENAMED_COLUMNS, read_rows
+from reviews.facets import rebuild_facets
+from reviews.models import Title
 
 
 class Command(BaseCommand):
     help = 'Load data from csv files into database'
-    map_ = {
-        'static/data/users.csv': User,
-        'static/data/category.csv': Category,
-        'static/data/genre.csv': Genre,
-        'static/data/titles.csv': Title,
-        'static/data/genre_title.csv': TitleGenre,
-        'static/data/review.csv': Review,
-        'static/data/comments.csv': Comment,
-    }
+    map_ = {dataset: model for dataset, (model, _) in DATASETS.items()}
+    renamed_columns = RENAMED_COLUMNS
     ERROR_MESSAGE = 'Ошибка загрузки объекта модели {}: {}'
+    ROW_ERROR_MESSAGE = 'Ошибка в строке {} файла {}: {}'
 
-    def handle(self, *args, **kwargs):
-        for path, model in self.map_.items():
-            with open(path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('author'):
-                        row['author_id'] = row['author']
-                        del row['author']
-                    if row.get('category'):
-                        row['category_id'] = row['category']
-                        del row['category']
-
-                    try:
-                        model.objects.get_or_create(**row)
-                    except Exception as e:
-                        print(self.ERROR_MESSAGE.format(model.__name__, e))
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', default=os.path.join('static', 'data'),
+            help='Directory with <dataset>.<format> files.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', dest='file_format'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per bulk insert and per transaction.'
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Drop secondary indexes before loading and rebuild after.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help=(
+                'Files loaded in parallel. Defaults to 1 on SQLite, '
+                'which allows a single writer, and to 4 elsewhere.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.defer_indexes = options['defer_indexes']
+        self.data_dir = options['data_dir']
+        self.file_format = options['file_format']
+        workers = options['workers'] or (
+            1 if connection.vendor == 'sqlite' else 4
+        )
+        failed = self.load_in_parallel(workers)
+        Title.objects.recalculate_ratings()
+        rebuild_facets()
+        if failed:
+            raise CommandError(
+                f'Files not loaded: {", ".join(sorted(failed))}'
+            )
 
         self.stdout.write(self.style.SUCCESS('Data loaded successfully'))
+
+    def dependencies(self):
+        """Файлы, от моделей которых по внешним ключам зависит каждый файл"""
+        paths = {model: path for path, model in self.map_.items()}
+        return {
+            path: {
+                paths[field.related_model]
+                for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model in paths
+                and field.related_model is not model
+            }
+            for path, model in self.map_.items()
+        }
+
+    def load_in_parallel(self, workers):
+        """
+        Загружает файлы пулом потоков: файл стартует, как только
+        загружены все файлы, от которых он зависит.
+        """
+        waiting = self.dependencies()
+        running = {}
+        failed = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while waiting or running:
+                ready = [path for path, parents in waiting.items()
+                         if not parents]
+                for path in ready:
+                    del waiting[path]
+                    running[executor.submit(self.load_task, path)] = path
+                if not running:
+                    raise CommandError(
+                        f'Circular dependency between: {", ".join(waiting)}'
+                    )
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        for parents in waiting.values():
+                            parents.discard(path)
+                        continue
+                    self.stderr.write(self.ERROR_MESSAGE.format(
+                        self.map_[path].__name__, error
+                    ))
+                    failed.add(path)
+                    failed.update(self.skip_dependents(path, waiting))
+        return failed
+
+    @staticmethod
+    def skip_dependents(path, waiting):
+        skipped = set()
+        queue = [path]
+        while queue:
+            parent = queue.pop()
+            for child in [child for child, parents in waiting.items()
+                          if parent in parents]:
+                del waiting[child]
+                skipped.add(child)
+                queue.append(child)
+        return skipped
+
+    def load_task(self, dataset):
+        path = os.path.join(self.data_dir, f'{dataset}.{self.file_format}')
+        try:
+            return self.load_file(path, self.map_[dataset], self.defer_indexes)
+        finally:
+            connection.close()
+
+    def load_file(self, path, model, defer_indexes=False):
+        file_format = os.path.splitext(path)[1].lstrip('.')
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = self.parse_rows(path, model, read_rows(f, file_format))
+            with self.deferred_indexes(model, defer_indexes):
+                loaded = processed = 0
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    processed += len(batch)
+                    loaded += self.insert_batch(model, batch)
+                    if self.verbosity > 1:
+                        self.stdout.write(
+                            f'{model.__name__}: {processed} rows processed, '
+                            f'{loaded} loaded'
+                        )
+        if self.verbosity:
+            self.stdout.write(f'{path}: {loaded} rows loaded')
+        return loaded
+
+    def parse_rows(self, path, model, rows):
+        """Приводит значения к типам полей модели, пропуская ошибочные."""
+        fields = {}
+        for line_num, row in rows:
+            try:
+                cleaned = {}
+                for name, value in row.items():
+                    column = self.renamed_columns.get(name, name)
+                    if column not in fields:
+                        fields[column] = model._meta.get_field(column)
+                    cleaned[column] = self.clean_value(fields[column], value)
+                yield cleaned
+            except ValidationError as e:
+                self.stderr.write(self.ROW_ERROR_MESSAGE.format(
+                    line_num, path, '; '.join(e.messages)
+                ))
+
+    @staticmethod
+    def clean_value(field, value):
+        if field.is_relation:
+            field = field.target_field
+        if value == '' and field.null and not field.empty_strings_allowed:
+            return None
+        value = field.to_python(value)
+        if value not in field.empty_values:
+            field.run_validators(value)
+        return value
+
+    def insert_batch(self, model, rows):
+        objects = [model(**row) for row in rows]
+        try:
+            with transaction.atomic():
+                return self.bulk_insert(model, objects)
+        except (DatabaseError, ValueError):
+            return self.insert_one_by_one(model, objects)
+
+    def insert_one_by_one(self, model, objects):
+        """Повторяет упавшую пачку построчно, чтобы найти плохие строки."""
+        loaded = 0
+        for obj in objects:
+            try:
+                with transaction.atomic():
+                    loaded += self.bulk_insert(model, [obj])
+            except (DatabaseError, ValueError) as e:
+                self.stderr.write(self.ERROR_MESSAGE.format(
+                    model.__name__, e
+                ))
+        return loaded
+
+    @staticmethod
+    def bulk_insert(model, objects):
+        """Вставляет объекты и возвращает число реально добавленных строк.
+
+        ignore_conflicts молча пропускает уже загруженные строки, поэтому
+        добавленные считаются по диапазону первичных ключей пачки.
+        """
+        pks = [obj.pk for obj in objects if obj.pk is not None]
+        batch_rows = (
+            model.objects.filter(pk__range=(min(pks), max(pks)))
+            if pks else model.objects.none()
+        )
+        before = batch_rows.count()
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        return len(objects) - len(pks) + batch_rows.count() - before
+
+    @contextmanager
+    def deferred_indexes(self, model, enabled):
+        """Удаляет вторичные индексы таблицы на время загрузки."""
+        if not enabled:
+            yield
+            return
+        indexes = self.secondary_indexes(model)
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(model, index)
+        try:
+            yield
+        finally:
+            if self.verbosity:
+                self.stdout.write(
+                    f'Rebuilding {len(indexes)} indexes of '
+                    f'{model._meta.db_table}'
+                )
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(model, index)
+
+    @staticmethod
+    def secondary_indexes(model):
+        """Индексы, которые можно удалить и пересоздать без потерь.
+
+        Это индексы из Meta.indexes и индексы внешних ключей. Прочие
+        индексы (например, *_like с varchar_pattern_ops в PostgreSQL)
+        не описываются через Index(fields=...) и остаются на месте.
+        """
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        indexes = [
+            index for index in model._meta.indexes
+            if index.name in constraints
+        ]
+        declared = {index.name for index in indexes}
+        foreign_keys = {
+            field.column: field.name
+            for field in model._meta.concrete_fields
+            if field.many_to_one and field.db_index
+        }
+        for name, info in constraints.items():
+            if (name in declared or not info['index'] or info['unique']
+                    or info['primary_key'] or name.endswith('_like')
+                    or len(info['columns']) != 1
+                    or info['columns'][0] not in foreign_keys):
+                continue
+            indexes.append(Index(
+                fields=[foreign_keys[info['columns'][0]]], name=name
+            ))
+        return indexes
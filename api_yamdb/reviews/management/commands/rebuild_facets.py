@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stored genre, category and year facet counts from titles'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_facets()
+        self.stdout.write(
+            self.style.SUCCESS(f'Facet counts rebuilt, counters: {count}')
+        )
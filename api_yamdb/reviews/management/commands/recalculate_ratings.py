@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored title ratings from reviews'
+
+    def handle(self, *args, **kwargs):
+        count = Title.objects.recalculate_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Ratings recalculated, updated titles: {count}'
+            )
+        )
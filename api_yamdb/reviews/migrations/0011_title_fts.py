@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 20:40
+
+from django.db import migrations
+
+from reviews.search import install_sqlite_fts, uninstall_sqlite_fts
+
+
+def install(apps, schema_editor):
+    install_sqlite_fts(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_sqlite_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_version_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
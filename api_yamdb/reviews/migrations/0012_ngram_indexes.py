@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 20:50
+
+from django.conf import settings
+from django.db import migrations
+
+from reviews.search import install_sqlite_ngram, uninstall_sqlite_ngram
+
+
+def install(apps, schema_editor):
+    install_sqlite_ngram(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_sqlite_ngram(schema_editor)
+
+
+class Migration(migrations.Migration):
+    # У приложения users нет своих миграций, поэтому индекс для
+    # users_user создаётся здесь же.
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0011_title_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
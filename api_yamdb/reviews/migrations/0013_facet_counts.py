@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+from reviews.facets import rebuild_facets
+
+
+def backfill(apps, schema_editor):
+    rebuild_facets(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_ngram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Десятилетие')], max_length=16, verbose_name='Фасет')),
+                ('key', models.IntegerField(help_text='id жанра или категории, первый год десятилетия', verbose_name='Ключ')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество произведений')),
+            ],
+            options={
+                'verbose_name': 'Счётчик фасета',
+                'verbose_name_plural': 'Счётчики фасетов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'key'), name='unique_facet_key'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, OuterRef, Subquery, Sum,
+                              When)
+from django.db.models.functions import Coalesce, NullIf
+from django.dispatch import Signal
+from django.utils import timezone
 
 from reviews.validators import validate_year
 from users.models import User
@@ -36,6 +41,72 @@ class Category(BaseModel):
         verbose_name_plural = 'Категории'
 
 
+# Отправляется после пересчёта рейтингов или счётчиков фасетов одним
+# UPDATE, который не вызывает сигналов моделей.
+titles_recalculated = Signal()
+
+
+class TitleQuerySet(models.QuerySet):
+    """Обслуживание хранимого рейтинга произведений"""
+
+    def apply_rating_delta(self, title_id, score_delta, count_delta):
+        """Атомарно сдвигает сумму и число оценок и пересчитывает рейтинг."""
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        return self.filter(pk=title_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(rating_count__gt=-count_delta,
+                     then=new_sum / new_count),
+                default=None,
+            ),
+            version=F('version') + 1,
+            modified=timezone.now(),
+        )
+
+    def touch(self):
+        """Отмечает произведения изменёнными для ETag и Last-Modified."""
+        return self.update(version=F('version') + 1, modified=timezone.now())
+
+    def recalculate_ratings(self):
+        """
+        Пересчитывает рейтинг произведений по таблице отзывов.
+
+        Изменяются только произведения с расходящимися счётчиками, их
+        версия увеличивается тем же UPDATE. Возвращает их число.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+        )
+        score_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+        )
+        rating = score_sum / NullIf(score_count, 0)
+        updated = self.annotate(
+            new_sum=score_sum,
+            new_count=score_count,
+            new_rating=Coalesce(rating, -1),
+            old_rating=Coalesce('rating', -1),
+        ).exclude(
+            rating_sum=F('new_sum'),
+            rating_count=F('new_count'),
+            old_rating=F('new_rating'),
+        ).update(
+            rating_sum=score_sum,
+            rating_count=score_count,
+            rating=rating,
+            version=F('version') + 1,
+            modified=timezone.now(),
+        )
+        if updated:
+            titles_recalculated.send(sender=Title)
+        return updated
+
+
 class Title(models.Model):
     """
     Произведения, к которым пишут отзывы (определённый фильм,
@@ -55,15 +126,76 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    version = models.PositiveIntegerField(
+        'Версия', default=1, editable=False
+    )
+    modified = models.DateTimeField('Дата изменения', auto_now=True)
+
+    objects = TitleQuerySet.as_manager()
+
+    COUNTER_FIELDS = frozenset(
+        ('rating_sum', 'rating_count', 'rating', 'version')
+    )
 
     class Meta:
         ordering = ('-year',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(
+                fields=('rating_count',), name='title_rating_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.year})'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_facet_state()
+        return instance
+
+    def remember_facet_state(self):
+        """Запоминает сохранённые категорию и год для счётчиков фасетов."""
+        deferred = self.get_deferred_fields()
+        self._saved_facets = (
+            None if deferred & {'category_id', 'year'}
+            else (self.category_id, self.year)
+        )
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if self._state.adding:
+            return super().save(*args, update_fields=update_fields, **kwargs)
+        # Счётчики меняют только атомарные UPDATE из TitleQuerySet:
+        # значения из памяти затёрли бы параллельные приращения.
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = {
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            }
+        update_fields = set(update_fields) - self.COUNTER_FIELDS
+        if update_fields:
+            self.version = F('version') + 1
+            update_fields.add('version')
+        super().save(*args, update_fields=update_fields, **kwargs)
+        if update_fields:
+            # Новая версия прочитается из базы при обращении.
+            del self.version
+
 
 class TitleGenre(models.Model):
     """Определение нескольких жанров произведений"""
@@ -78,6 +210,47 @@ class TitleGenre(models.Model):
         verbose_name='Жанр'
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('genre', 'title'), name='titlegenre_genre_title_idx'
+            )
+        ]
+
+
+class FacetCount(models.Model):
+    """
+    Число произведений в жанре, категории или десятилетии выхода.
+    Поддерживается сигналами при изменении произведений и их жанров.
+    """
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    YEAR = 'year'
+    FACETS = (
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (YEAR, 'Десятилетие'),
+    )
+
+    facet = models.CharField('Фасет', max_length=16, choices=FACETS)
+    key = models.IntegerField(
+        'Ключ', help_text='id жанра или категории, первый год десятилетия'
+    )
+    count = models.IntegerField('Количество произведений', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик фасета'
+        verbose_name_plural = 'Счётчики фасетов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('facet', 'key'),
+                name='unique_facet_key'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.facet}:{self.key} = {self.count}'
+
 
 class BaseReviewComment(models.Model):
     """Абстрактная модель для Отзывов и Комментариев"""
@@ -90,9 +263,11 @@ class BaseReviewComment(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Автор',
     )
+    # default вместо auto_now_add: загрузка из файлов сохраняет свои даты.
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True,
     )
 
@@ -121,7 +296,7 @@ class Review(BaseReviewComment):
         ],
     )
 
-    class Meta:
+    class Meta(BaseReviewComment.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
@@ -131,6 +306,30 @@ class Review(BaseReviewComment):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx'
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Запоминает сохранённые оценку и произведение для пересчёта."""
+        deferred = self.get_deferred_fields()
+        self._saved_score = None if 'score' in deferred else self.score
+        self._saved_title_id = (
+            None if 'title_id' in deferred else self.title_id
+        )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Comment(BaseReviewComment):
@@ -141,7 +340,13 @@ class Comment(BaseReviewComment):
         verbose_name='Ревью',
     )
 
-    class Meta:
+    class Meta(BaseReviewComment.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date'),
+                name='comment_review_pub_date_idx'
+            )
+        ]
@@ -0,0 +1,293 @@
+"""
+Поиск по каталогу и пользователям.
+
+Полнотекстовый поиск произведений выбирается настройкой
+TITLE_SEARCH_BACKEND, поиск подстроки в коротких полях (жанры,
+категории, username) — настройкой NGRAM_SEARCH_BACKEND. Если настройки
+не заданы, на SQLite используются индексы FTS5, на остальных базах —
+поиск по вхождению. Бэкенды для PostgreSQL (tsvector/триграммы)
+подключаются теми же настройками.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+INSTALL_SQL = (
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+
+UNINSTALL_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def install_sqlite_fts(schema_editor):
+    """Создаёт индекс FTS5 и триггеры заново; безопасно вызывать повторно."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in UNINSTALL_SQL + INSTALL_SQL:
+        schema_editor.execute(statement)
+
+
+def uninstall_sqlite_fts(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in UNINSTALL_SQL:
+        schema_editor.execute(statement)
+
+
+class BaseTitleSearch:
+    """Интерфейс поиска: фильтрует и упорядочивает по релевантности."""
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class ContainsTitleSearch(BaseTitleSearch):
+    """Поиск по вхождению в название и описание без индекса."""
+
+    def search(self, queryset, query):
+        condition = Q()
+        for word in query.split():
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset.filter(condition)
+
+
+class SQLiteFTSTitleSearch(BaseTitleSearch):
+    """Поиск по индексу FTS5 с ранжированием bm25."""
+    table = 'reviews_title_fts'
+
+    @staticmethod
+    def match_expression(query):
+        """Слова запроса ищутся как префиксы, синтаксис FTS5 экранируется."""
+        words = re.findall(r'\w+', query)
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.none()
+        table = self.table
+        matched = RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+            (expression,)
+        )
+        rank = RawSQL(
+            f'SELECT rank FROM {table} WHERE {table} MATCH %s '
+            f'AND rowid = reviews_title.id',
+            (expression,)
+        )
+        return queryset.filter(id__in=matched).annotate(
+            search_rank=rank
+        ).order_by(F('search_rank').asc(), 'name')
+
+
+@lru_cache(maxsize=None)
+def get_title_search():
+    backend = settings.TITLE_SEARCH_BACKEND
+    if backend is None:
+        backend = (
+            'reviews.search.SQLiteFTSTitleSearch'
+            if connection.vendor == 'sqlite'
+            else 'reviews.search.ContainsTitleSearch'
+        )
+    return import_string(backend)()
+
+
+NGRAM_INDEXES = (
+    ('reviews_genre', 'name'),
+    ('reviews_category', 'name'),
+    ('users_user', 'username'),
+)
+NGRAM_MIN_LENGTH = 3
+
+
+def ngram_table(table, column):
+    return f'{table}_{column}_ngram'
+
+
+def ngram_sql(table, column):
+    """Индекс FTS5 с токенизатором trigram и триггеры синхронизации."""
+    fts = ngram_table(table, column)
+    install = (
+        f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {column}, content='{table}', content_rowid='id',
+            tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_update AFTER UPDATE OF {column} ON {table}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+            INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+        END
+        """,
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    )
+    uninstall = (
+        f'DROP TRIGGER IF EXISTS {fts}_insert',
+        f'DROP TRIGGER IF EXISTS {fts}_delete',
+        f'DROP TRIGGER IF EXISTS {fts}_update',
+        f'DROP TABLE IF EXISTS {fts}',
+    )
+    return install, uninstall
+
+
+def sqlite_has_trigram(connection):
+    """Токенизатор trigram появился в SQLite 3.34."""
+    return connection.Database.sqlite_version_info >= (3, 34)
+
+
+def install_sqlite_ngram(schema_editor):
+    """
+    Создаёт индексы для существующих таблиц.
+
+    Таблица users_user без миграций появляется только при
+    ``migrate --run-syncdb``; без неё поиск по username идёт через
+    icontains.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or not sqlite_has_trigram(connection):
+        return
+    tables = connection.introspection.table_names()
+    for table, column in NGRAM_INDEXES:
+        if table not in tables:
+            continue
+        install, uninstall = ngram_sql(table, column)
+        for statement in uninstall + install:
+            schema_editor.execute(statement)
+
+
+def uninstall_sqlite_ngram(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, column in NGRAM_INDEXES:
+        for statement in ngram_sql(table, column)[1]:
+            schema_editor.execute(statement)
+
+
+class ContainsSearch:
+    """Поиск подстроки через icontains, без индекса."""
+
+    def search(self, queryset, field_name, terms):
+        for term in terms:
+            queryset = queryset.filter(**{f'{field_name}__icontains': term})
+        return queryset
+
+
+class SQLiteTrigramSearch(ContainsSearch):
+    """
+    Поиск подстроки по триграммному индексу FTS5.
+
+    Слова короче трёх символов не дают ни одной триграммы и ищутся
+    через icontains; то же для полей без индекса.
+    """
+
+    def search(self, queryset, field_name, terms):
+        field = queryset.model._meta.get_field(field_name)
+        table = queryset.model._meta.db_table
+        if (table, field.column) not in NGRAM_INDEXES:
+            return super().search(queryset, field_name, terms)
+        fts = ngram_table(table, field.column)
+        if fts not in installed_ngram_tables():
+            return super().search(queryset, field_name, terms)
+        short_terms = []
+        for term in terms:
+            if len(term) < NGRAM_MIN_LENGTH:
+                short_terms.append(term)
+                continue
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s',
+                ('"{}"'.format(term.replace('"', '""')),)
+            ))
+        return super().search(queryset, field_name, short_terms)
+
+
+@lru_cache(maxsize=None)
+def installed_ngram_tables():
+    return frozenset(
+        name for name in connection.introspection.table_names()
+        if name.endswith('_ngram')
+    )
+
+
+@lru_cache(maxsize=None)
+def get_ngram_search():
+    backend = settings.NGRAM_SEARCH_BACKEND
+    if backend is None:
+        backend = (
+            'reviews.search.SQLiteTrigramSearch'
+            if connection.vendor == 'sqlite' and sqlite_has_trigram(connection)
+            else 'reviews.search.ContainsSearch'
+        )
+    return import_string(backend)()
+
+
+@receiver(setting_changed)
+def reset_search_backends(setting, **kwargs):
+    if setting == 'TITLE_SEARCH_BACKEND':
+        get_title_search.cache_clear()
+    if setting == 'NGRAM_SEARCH_BACKEND':
+        get_ngram_search.cache_clear()
+        installed_ngram_tables.cache_clear()
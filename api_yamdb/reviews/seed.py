@@ -0,0 +1,108 @@
+"""
+Воспроизводимые наборы данных для бенчмарков.
+
+Образцы названий, жанров и текстов берутся из файлов static/data, числа
+и связи — из random.Random с заданным seed, поэтому одинаковые
+параметры дают одинаковые данные.
+"""
+
+import csv
+import os
+import random
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from reviews.bulk import bulk_insert
+from reviews.facets import rebuild_facets
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre)
+from users.models import User
+
+SIZES = {
+    'small': 10_000,
+    'medium': 100_000,
+    'large': 1_000_000,
+}
+REVIEWS_PER_TITLE = 100
+COMMENTS_PER_REVIEW = 0.1
+
+
+@dataclass
+class SeededDataset:
+    users: list
+    titles: list
+    reviews: list
+    comments: int
+
+
+def read_samples(name, column):
+    path = os.path.join(settings.BASE_DIR, 'static', 'data', f'{name}.csv')
+    with open(path, encoding='utf-8', newline='') as f:
+        return [row[column] for row in csv.DictReader(f)]
+
+
+def seed_dataset(reviews, seed=0, batch_size=5000):
+    """
+    Создаёт ``reviews`` отзывов и пропорциональное число пользователей,
+    произведений, жанров, категорий и комментариев.
+    """
+    rng = random.Random(seed)
+    titles = max(1, -(-reviews // REVIEWS_PER_TITLE))
+    users = max(REVIEWS_PER_TITLE, titles)
+    comments = int(reviews * COMMENTS_PER_REVIEW)
+
+    genre_names = read_samples('genre', 'name')
+    category_names = read_samples('category', 'name')
+    title_names = read_samples('titles', 'name')
+    review_texts = read_samples('review', 'text')
+    comment_texts = read_samples('comments', 'text')
+
+    genre_ids = bulk_insert(Genre, (
+        Genre(name=name, slug=f'seed-genre-{i}')
+        for i, name in enumerate(genre_names)
+    ), batch_size)
+    category_ids = bulk_insert(Category, (
+        Category(name=name, slug=f'seed-category-{i}')
+        for i, name in enumerate(category_names)
+    ), batch_size)
+    user_ids = bulk_insert(User, (
+        User(username=f'seed_user_{i}', email=f'seed_user_{i}@yamdb.fake')
+        for i in range(users)
+    ), batch_size)
+    title_ids = bulk_insert(Title, (
+        Title(
+            name=f'{title_names[i % len(title_names)]} {i}',
+            year=rng.randint(1900, 2023),
+            description=review_texts[i % len(review_texts)][:200],
+            category_id=rng.choice(category_ids),
+        )
+        for i in range(titles)
+    ), batch_size)
+    bulk_insert(TitleGenre, (
+        TitleGenre(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, rng.randint(1, 2))
+    ), batch_size)
+    # Автор i-го отзыва на произведение — i-й пользователь, поэтому
+    # пара (произведение, автор) уникальна.
+    review_ids = bulk_insert(Review, (
+        Review(
+            title_id=title_ids[i % titles],
+            author_id=user_ids[i // titles],
+            text=review_texts[i % len(review_texts)],
+            score=rng.randint(1, 10),
+        )
+        for i in range(reviews)
+    ), batch_size)
+    bulk_insert(Comment, (
+        Comment(
+            review_id=rng.choice(review_ids),
+            author_id=rng.choice(user_ids),
+            text=comment_texts[i % len(comment_texts)],
+        )
+        for i in range(comments)
+    ), batch_size)
+    Title.objects.recalculate_ratings()
+    rebuild_facets()
+    return SeededDataset(user_ids, title_ids, review_ids, comments)
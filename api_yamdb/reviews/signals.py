@@ -0,0 +1,157 @@
+from collections import Counter
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from reviews.facets import apply_facet_deltas, title_facets
+from reviews.models import (Category, FacetCount, Genre, Review, Title,
+                            TitleGenre)
+from users.models import User
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Обновляет хранимый рейтинг при создании или изменении отзыва"""
+    if raw:
+        return
+    old_title_id = getattr(instance, '_saved_title_id', None)
+    old_score = getattr(instance, '_saved_score', None)
+    if created:
+        Title.objects.apply_rating_delta(instance.title_id, instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        Title.objects.filter(
+            pk__in={instance.title_id, old_title_id} - {None}
+        ).recalculate_ratings()
+    elif old_title_id != instance.title_id:
+        Title.objects.apply_rating_delta(old_title_id, -old_score, -1)
+        Title.objects.apply_rating_delta(instance.title_id, instance.score, 1)
+    else:
+        Title.objects.apply_rating_delta(
+            instance.title_id, instance.score - old_score, 0
+        )
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва из рейтинга произведения"""
+    Title.objects.apply_rating_delta(instance.title_id, -instance.score, -1)
+
+
+@receiver((post_save, post_delete), sender=TitleGenre)
+def touch_title_of_genre_link(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(pk=instance.title_id).touch()
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def touch_titles_on_genres_change(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    """Отмечает изменёнными произведения при title.genre.set() и т.п."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        Title.objects.filter(pk=instance.pk).touch()
+    elif action == 'pre_clear':
+        Title.objects.filter(genre=instance).touch()
+    else:
+        Title.objects.filter(pk__in=pk_set).touch()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_titles_of_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(category=instance).touch()
+
+
+@receiver(post_save, sender=Genre)
+def touch_titles_of_genre(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(pre_save, sender=User)
+def load_saved_username(sender, instance, raw=False, **kwargs):
+    instance._saved_username = None if raw or instance._state.adding else (
+        User.objects.filter(pk=instance.pk).values_list(
+            'username', flat=True
+        ).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_titles_of_renamed_author(sender, instance, raw=False, **kwargs):
+    """Имя автора входит в списки отзывов, их ETag — версия произведения"""
+    saved = getattr(instance, '_saved_username', None)
+    if saved is not None and saved != instance.username:
+        Title.objects.filter(reviews__author=instance).touch()
+
+
+@receiver(pre_save, sender=Title)
+def load_saved_facets(sender, instance, raw=False, **kwargs):
+    """Читает прежние категорию и год, если они не запомнены при загрузке"""
+    if raw or instance._state.adding or getattr(
+        instance, '_saved_facets', None
+    ):
+        return
+    instance._saved_facets = Title.objects.filter(
+        pk=instance.pk
+    ).values_list('category_id', 'year').first()
+
+
+@receiver(post_save, sender=Title)
+def update_facets_on_title_save(sender, instance, created, raw=False,
+                                **kwargs):
+    """Переносит произведение в счётчики новой категории и десятилетия"""
+    if raw:
+        return
+    deltas = Counter(title_facets(instance.category_id, instance.year))
+    saved = getattr(instance, '_saved_facets', None)
+    if not created and saved is not None:
+        deltas.subtract(title_facets(*saved))
+    apply_facet_deltas(deltas)
+    instance.remember_facet_state()
+
+
+@receiver(post_delete, sender=Title)
+def update_facets_on_title_delete(sender, instance, **kwargs):
+    apply_facet_deltas(Counter(
+        {key: -1 for key in title_facets(instance.category_id, instance.year)}
+    ))
+
+
+@receiver(post_save, sender=TitleGenre)
+def update_facets_on_genre_link(sender, instance, created, raw=False,
+                                **kwargs):
+    if created and not raw:
+        apply_facet_deltas({(FacetCount.GENRE, instance.genre_id): 1})
+
+
+@receiver(post_delete, sender=TitleGenre)
+def update_facets_on_genre_unlink(sender, instance, **kwargs):
+    """Вызывается и для remove()/clear()/set(): они удаляют связи queryset"""
+    apply_facet_deltas({(FacetCount.GENRE, instance.genre_id): -1})
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def update_facets_on_genres_add(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    """add() создаёт связи через bulk_create, без post_save"""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        apply_facet_deltas({(FacetCount.GENRE, instance.pk): len(pk_set)})
+    else:
+        apply_facet_deltas({(FacetCount.GENRE, pk): 1 for pk in pk_set})
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def delete_facet_count(sender, instance, **kwargs):
+    """SET_NULL у произведений категории выполняется без сигналов"""
+    facet = (
+        FacetCount.CATEGORY if sender is Category else FacetCount.GENRE
+    )
+    FacetCount.objects.filter(facet=facet, key=instance.pk).delete()
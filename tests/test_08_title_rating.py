@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        return client.get(f'/api/v1/titles/{title_id}/').json().get('rating')
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user,
+                                       user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/{{review_id}}/'
+
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения обновляется при '
+            'создании отзыва.'
+        )
+
+        admin_client.patch(
+            url.format(review_id=reviews[0]['id']), data={'score': 8}
+        )
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        admin_client.delete(url.format(review_id=reviews[1]['id']))
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        admin_client.delete(url.format(review_id=reviews[0]['id']))
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin, user,
+                                            user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('recalculate_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            10, 2, 5
+        ), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'хранимый рейтинг произведений по отзывам.'
+        )
+
+    def test_03_save_keeps_counters(self, admin_client, admin, user,
+                                    user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title = Title.objects.get(pk=titles[0]['id'])
+        version = title.version
+        Title.objects.apply_rating_delta(title.pk, 10, 1)
+        title.name = 'Новое название'
+        title.save()
+        saved = Title.objects.get(pk=title.pk)
+        assert (saved.rating_sum, saved.rating_count) == (20, 3), (
+            'Проверьте, что `Title.save()` не перезаписывает счётчики '
+            'оценок значениями из памяти.'
+        )
+        assert saved.name == 'Новое название'
+        assert title.version == saved.version == version + 2, (
+            'Проверьте, что `Title.save()` атомарно увеличивает версию.'
+        )
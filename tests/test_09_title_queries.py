@@ -0,0 +1,41 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    def test_01_title_list_queries(self, admin_client, client,
+                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        # count + произведения с категориями + жанры
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 2, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает все '
+            'произведения.'
+        )
+
+        for title in titles:
+            data = {key: value for key, value in title.items() if key != 'id'}
+            admin_client.post(url, data=data)
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['count'] == 4, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает все '
+            'произведения.'
+        )
+
+    def test_02_title_detail_queries(self, admin_client, client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        # версия для ETag + произведение с категорией + жанры
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['genre']) == 2, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает жанры '
+            'произведения.'
+        )
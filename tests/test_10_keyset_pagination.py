@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    def test_01_comments_cursor_pages(self, admin_client, admin, user,
+                                      user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        expected_ids = [
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[0]['id'], str(idx)
+            ).json()['id']
+            for idx in range(12)
+        ]
+
+        response = user_client.get(url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме пагинации ответ не содержит '
+            'ключ `count`.'
+        )
+        assert data['previous'] is None
+        received_ids = [item['id'] for item in data['results']]
+        while data['next']:
+            data = user_client.get(data['next']).json()
+            received_ids.extend(item['id'] for item in data['results'])
+        assert received_ids == expected_ids, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'комментарии по порядку и без повторов.'
+        )
+
+        previous = user_client.get(data['previous']).json()
+        assert [item['id'] for item in previous['results']] == (
+            expected_ids[5:10]
+        ), (
+            f'Проверьте, что ссылка `previous` курсорной пагинации `{url}` '
+            'возвращает предыдущую страницу.'
+        )
+
+    def test_02_invalid_cursor(self, admin_client, user, user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.get(url, {'cursor': 'not-a-cursor'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{url}` с некорректным курсором '
+            'возвращает ответ со статусом 404.'
+        )
+        response = user_client.get(url)
+        assert 'count' in response.json(), (
+            f'Проверьте, что без параметра `cursor` эндпоинт `{url}` '
+            'использует постраничную пагинацию.'
+        )
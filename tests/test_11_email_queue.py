@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db.models import Q
+
+from emails.models import OutboxEmail
+from emails.queue import get_email_queue
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+VALID_DATA = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11EmailQueue:
+
+    def test_01_thread_queue(self, client, settings):
+        settings.EMAIL_QUEUE_BACKEND = 'emails.queue.ThreadEmailQueue'
+        outbox_before_count = len(mail.outbox)
+
+        response = client.post(URL_SIGNUP, data=VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+
+        email_queue = get_email_queue()
+        email_queue.join()
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что фоновая очередь отправляет письмо с кодом '
+            'подтверждения.'
+        )
+        stats = email_queue.stats()
+        assert (stats['depth'], stats['sent']) == (0, 1)
+
+    def test_02_outbox_queue(self, client, settings):
+        settings.EMAIL_QUEUE_BACKEND = 'emails.queue.OutboxEmailQueue'
+
+        response = client.post(URL_SIGNUP, data=VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+
+        get_email_queue().join()
+        email = OutboxEmail.objects.get()
+        assert email.recipient_list == [VALID_DATA['email']]
+        assert email.status == OutboxEmail.SENT, (
+            'Проверьте, что письмо из таблицы исходящих помечается '
+            'отправленным.'
+        )
+
+    def test_03_outbox_retry(self, settings):
+        settings.EMAIL_QUEUE_BACKEND = 'emails.queue.OutboxEmailQueue'
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        email = OutboxEmail.objects.create(
+            subject='subject', message='message',
+            from_email='noreply@yamdb.fake', recipients='to@yamdb.fake'
+        )
+        settings.EMAIL_BACKEND = 'unknown.backend'
+        call_command('send_queued_emails')
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutboxEmail.PENDING, 1)
+        assert email.next_attempt_at > email.created
+
+        OutboxEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_queued_emails')
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutboxEmail.FAILED, 2), (
+            'Проверьте, что письмо помечается неотправленным после '
+            'исчерпания попыток.'
+        )
+
+    def test_04_outbox_claim(self, settings):
+        settings.EMAIL_QUEUE_BACKEND = 'emails.queue.OutboxEmailQueue'
+        email_queue = get_email_queue()
+        email = OutboxEmail.objects.create(
+            subject='subject', message='message',
+            from_email='noreply@yamdb.fake', recipients='to@yamdb.fake'
+        )
+        pending = Q(status=OutboxEmail.PENDING)
+        assert email_queue.claim(email.pk, pending) == email
+        assert email_queue.claim(email.pk, pending) is None, (
+            'Проверьте, что письмо может забрать только один отправитель.'
+        )
+        outbox_before_count = len(mail.outbox)
+        email_queue.process(email.pk)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что забранное письмо не отправляется повторно.'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_queued_emails')
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.SENT, (
+            'Проверьте, что письмо, забранное упавшим процессом, '
+            'отправляется после истечения срока.'
+        )
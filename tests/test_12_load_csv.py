@@ -0,0 +1,110 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from reviews.management.commands.load_cvs_data import Command
+from reviews.models import Comment, Review, Title, TitleGenre
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_PATH, filename), encoding='utf-8') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12LoadCsv:
+
+    @pytest.mark.parametrize('defer_indexes', (False, True))
+    def test_01_load_all_files(self, monkeypatch, defer_indexes):
+        monkeypatch.chdir(MANAGE_PATH)
+        call_command('load_cvs_data', batch_size=10,
+                     defer_indexes=defer_indexes, verbosity=0)
+
+        for model, filename in (
+            (Title, 'titles.csv'),
+            (TitleGenre, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                'Проверьте, что команда `load_cvs_data` загружает все строки '
+                f'файла `{filename}`.'
+            )
+        assert str(Review.objects.get(pk=1).pub_date) == (
+            '2019-09-24 21:08:21.567000+00:00'
+        ), 'Проверьте, что дата публикации берётся из файла.'
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True
+        ).exists(), (
+            'Проверьте, что после загрузки пересчитывается рейтинг '
+            'произведений.'
+        )
+
+        call_command('load_cvs_data', verbosity=0)
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что повторная загрузка не создаёт дубликатов.'
+        )
+
+    def test_02_dependencies_from_foreign_keys(self):
+        dependencies = Command().dependencies()
+        assert dependencies['category'] == set()
+        assert dependencies['review'] == {'users', 'titles'}, (
+            'Проверьте, что зависимости файлов строятся по внешним ключам '
+            'моделей.'
+        )
+
+    def test_03_failed_file_skips_dependents(self, monkeypatch):
+        monkeypatch.chdir(MANAGE_PATH)
+        load_file = Command.load_file
+
+        def broken_load_file(self, path, model, defer_indexes=False):
+            if model is Title:
+                raise OSError('broken file')
+            return load_file(self, path, model, defer_indexes)
+
+        monkeypatch.setattr(Command, 'load_file', broken_load_file)
+        with pytest.raises(CommandError):
+            call_command('load_cvs_data', workers=1, verbosity=0)
+        assert not Review.objects.exists(), (
+            'Проверьте, что файлы, зависящие от незагруженного, '
+            'не загружаются.'
+        )
+
+    def test_04_reload_reports_inserted_rows(self, monkeypatch):
+        monkeypatch.chdir(MANAGE_PATH)
+        call_command('load_cvs_data', verbosity=0)
+        out = StringIO()
+        call_command('load_cvs_data', stdout=out, verbosity=1)
+        assert os.path.join('static', 'data', 'review.csv') + (
+            ': 0 rows loaded'
+        ) in out.getvalue(), (
+            'Проверьте, что строки, пропущенные из-за конфликтов, '
+            'не считаются загруженными.'
+        )
+
+    def test_05_deferred_indexes_are_declared_or_foreign_keys(self):
+        names = {index.name for index in Command.secondary_indexes(Review)}
+        declared = {index.name for index in Review._meta.indexes}
+        assert declared <= names, (
+            'Проверьте, что откладываются индексы из `Meta.indexes`.'
+        )
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Review._meta.db_table
+            )
+        foreign_key_columns = {
+            field.column for field in Review._meta.concrete_fields
+            if field.many_to_one
+        }
+        for name in names - declared:
+            assert constraints[name]['columns'][0] in foreign_key_columns, (
+                'Проверьте, что кроме `Meta.indexes` откладываются только '
+                'индексы внешних ключей.'
+            )
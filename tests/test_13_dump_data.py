@@ -0,0 +1,71 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, TitleGenre
+from tests.conftest import MANAGE_PATH
+from users.models import User
+
+MODELS = (User, Title, TitleGenre, Review, Comment)
+
+
+def snapshot():
+    return {
+        model.__name__: sorted(model.objects.values_list('pk', flat=True))
+        for model in MODELS
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13DumpData:
+
+    @pytest.mark.parametrize('file_format', ('csv', 'jsonl'))
+    def test_01_dump_and_load_back(self, monkeypatch, tmp_path, file_format):
+        monkeypatch.chdir(MANAGE_PATH)
+        call_command('load_cvs_data', verbosity=0)
+        expected = snapshot()
+        review = Review.objects.get(pk=1)
+
+        call_command('dump_data', str(tmp_path), file_format=file_format,
+                     chunk_size=10, verbosity=0)
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+        call_command('load_cvs_data', data_dir=str(tmp_path),
+                     file_format=file_format, verbosity=0)
+
+        assert snapshot() == expected, (
+            'Проверьте, что `load_cvs_data` загружает выгрузку `dump_data` '
+            f'в формате {file_format} без потерь.'
+        )
+        loaded = Review.objects.get(pk=1)
+        assert (loaded.text, loaded.pub_date, loaded.author_id) == (
+            review.text, review.pub_date, review.author_id
+        )
+
+    def test_02_export_endpoint(self, admin_client, user_client, client,
+                                monkeypatch):
+        monkeypatch.chdir(MANAGE_PATH)
+        call_command('load_cvs_data', verbosity=0)
+        url = '/api/v1/export/titles.jsonl'
+
+        for api_client, status in (
+            (client, HTTPStatus.UNAUTHORIZED),
+            (user_client, HTTPStatus.FORBIDDEN),
+        ):
+            assert api_client.get(url).status_code == status, (
+                f'Проверьте, что эндпоинт `{url}` доступен только '
+                'администратору.'
+            )
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == Title.objects.count()
+        assert json.loads(lines[0])['name'] == (
+            Title.objects.order_by('pk').first().name
+        )
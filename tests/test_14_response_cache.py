@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_versions
+from reviews.models import Category
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_anonymous_get_is_cached(self, admin_client, client,
+                                        django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        first = client.get(url, {'year': 1984})
+        with django_assert_num_queries(0):
+            second = client.get(url, {'year': 1984})
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+            'отдаётся из кеша.'
+        )
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что ключ кеша учитывает параметры запроса.'
+        )
+
+    def test_02_invalidated_by_signals(self, admin_client, client,
+                                       user_client):
+        titles, categories, _ = create_titles(admin_client)
+        detail_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        assert client.get(detail_url).json()['rating'] is None
+        client.get(other_url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert client.get(detail_url).json()['rating'] == 7, (
+            'Проверьте, что кеш произведения сбрасывается при создании '
+            'отзыва.'
+        )
+
+        response = admin_client.delete(
+            f'/api/v1/categories/{categories[1]["slug"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(other_url).json()['category'] is None, (
+            'Проверьте, что кеш произведений сбрасывается при удалении '
+            'категории.'
+        )
+        assert len(client.get('/api/v1/categories/').json()['results']) == 1
+
+    def test_03_authenticated_requests_bypass_cache(self, admin_client,
+                                                    client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert any(
+            'reviews_title' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что запросы авторизованных пользователей не '
+            'обслуживаются из кеша.'
+        )
+
+    def test_04_bumped_after_commit(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        before = get_versions(['titles', 'titles:list'])
+        with transaction.atomic():
+            Category.objects.create(name='Музыка', slug='music')
+            assert get_versions(['titles', 'titles:list']) == before, (
+                'Проверьте, что версии кеша увеличиваются только после '
+                'коммита транзакции.'
+            )
+        assert get_versions(['titles', 'titles:list']) != before
+
+        client.get(url)
+        before = get_versions(['titles'])
+        call_command('rebuild_facets', verbosity=0)
+        assert get_versions(['titles']) != before, (
+            'Проверьте, что пересборка счётчиков фасетов сбрасывает кеш '
+            'произведений.'
+        )
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    @pytest.mark.parametrize('suffix', ('', 'reviews/'))
+    def test_01_etag(self, admin_client, user_client, suffix,
+                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/{suffix}'
+
+        response = user_client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+
+        # пользователь из токена + версия произведения
+        with django_assert_num_queries(2):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `ETag` ответа `{url}` меняется после '
+            'добавления отзыва.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_if_modified_since(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-Modified-Since` возвращает ответ со статусом 304.'
+        )
+
+    def test_03_genre_change_changes_etag(self, admin_client, client):
+        titles, _, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` произведения меняется при изменении '
+            'его жанров.'
+        )
+
+    def test_04_missing_title(self, client):
+        response = client.get('/api/v1/titles/100500/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_author_rename_changes_etag(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = user_client.get(url)['ETag']
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` списка отзывов меняется при изменении '
+            'имени автора отзыва.'
+        )
+
+    def test_06_recalculate_ratings_changes_etag(self, admin_client,
+                                                 user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        etag = user_client.get(url)['ETag']
+        call_command('recalculate_ratings', verbosity=0)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` произведения меняется при пересчёте '
+            'рейтинга.'
+        )
+        assert response.json()['rating'] == 7
+        etag = response['ETag']
+        call_command('recalculate_ratings', verbosity=0)
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что пересчёт без изменений не меняет `ETag`.'
+        )
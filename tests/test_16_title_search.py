@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/'
+
+
+def search(client, query):
+    response = client.get(URL, {'search': query})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}` с параметром `search` '
+        'возвращает ответ со статусом 200.'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleSearch:
+
+    def test_01_search_name_and_description(self, admin_client):
+        create_titles(admin_client)
+        assert search(admin_client, 'термин') == ['Терминатор'], (
+            'Проверьте, что поиск находит произведение по началу слова '
+            'в названии без учёта регистра.'
+        )
+        assert search(admin_client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск находит произведение по описанию.'
+        )
+        assert search(admin_client, 'терминатор орешек') == []
+        assert search(admin_client, '"*(') == []
+
+    def test_02_ranked_by_relevance(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{URL}{titles[0]["id"]}/',
+            data={'description': 'Орешек. Орешек крепкий, орешек!'}
+        )
+        assert search(admin_client, 'орешек') == [
+            'Терминатор', 'Крепкий орешек'
+        ], 'Проверьте, что результаты поиска упорядочены по релевантности.'
+
+    def test_03_index_follows_changes(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{URL}{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Робокоп'})
+        assert search(admin_client, 'терминатор') == []
+        assert search(admin_client, 'робокоп') == ['Робокоп'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(url)
+        assert search(admin_client, 'робокоп') == [], (
+            'Проверьте, что удалённое произведение не находится поиском.'
+        )
+
+    def test_04_contains_backend(self, admin_client, settings):
+        settings.TITLE_SEARCH_BACKEND = 'reviews.search.ContainsTitleSearch'
+        create_titles(admin_client)
+        assert search(admin_client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что бэкенд поиска выбирается настройкой '
+            '`TITLE_SEARCH_BACKEND`.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_genre
+
+GENRES_URL = '/api/v1/genres/'
+USERS_URL = '/api/v1/users/'
+
+
+def search(client, url, query, field, **params):
+    response = client.get(url, {'search': query, **params})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` с параметром `search` '
+        'возвращает ответ со статусом 200.'
+    )
+    return sorted(item[field] for item in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17IndexedSearch:
+
+    def test_01_contains(self, admin_client):
+        create_genre(admin_client)
+        assert search(admin_client, GENRES_URL, 'МЕДИ', 'name') == [
+            'Комедия'
+        ], (
+            'Проверьте, что поиск жанров находит подстроку в названии '
+            'без учёта регистра.'
+        )
+        assert search(admin_client, GENRES_URL, 'ра', 'name') == [
+            'Драма'
+        ], 'Проверьте, что поиск работает для запросов короче трёх букв.'
+        assert search(admin_client, GENRES_URL, 'ужасы драма', 'name') == []
+
+    def test_02_index_follows_changes(self, admin_client):
+        create_genre(admin_client)
+        admin_client.delete(f'{GENRES_URL}comedy/')
+        assert search(admin_client, GENRES_URL, 'меди', 'name') == [], (
+            'Проверьте, что удалённый жанр не находится поиском.'
+        )
+
+    def test_03_users_prefix_and_exact(self, admin_client, moderator, user):
+        assert search(admin_client, USERS_URL, 'mod', 'username') == [
+            'TestModerator'
+        ], 'Проверьте, что поиск пользователей находит подстроку в username.'
+        assert search(
+            admin_client, USERS_URL, 'Test', 'username', search_mode='prefix'
+        ) == ['TestAdmin', 'TestModerator', 'TestUser'], (
+            'Проверьте, что `search_mode=prefix` ищет по началу username.'
+        )
+        assert search(
+            admin_client, USERS_URL, 'est', 'username', search_mode='prefix'
+        ) == []
+        assert search(
+            admin_client, USERS_URL, 'TestUser', 'username',
+            search_mode='exact'
+        ) == ['TestUser'], (
+            'Проверьте, что `search_mode=exact` ищет точное совпадение.'
+        )
+
+    def test_04_slug_prefix_and_invalid_mode(self, admin_client):
+        create_genre(admin_client)
+        assert search(
+            admin_client, GENRES_URL, 'dr', 'slug', search_mode='prefix'
+        ) == ['drama'], (
+            'Проверьте, что поиск жанров по префиксу идёт по slug.'
+        )
+        response = admin_client.get(
+            GENRES_URL, {'search': 'dr', 'search_mode': 'fuzzy'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестный `search_mode` возвращает 400.'
+        )
+        assert search(
+            admin_client, GENRES_URL, '\U0010ffff', 'slug',
+            search_mode='prefix'
+        ) == [], (
+            'Проверьте, что префикс с последним символом U+10FFFF не '
+            'приводит к ошибке.'
+        )
+        assert search(
+            admin_client, GENRES_URL, 'd\U0010ffff', 'slug',
+            search_mode='prefix'
+        ) == []
+
+    def test_05_contains_backend(self, admin_client, settings):
+        settings.NGRAM_SEARCH_BACKEND = 'reviews.search.ContainsSearch'
+        create_genre(admin_client)
+        assert search(admin_client, GENRES_URL, 'меди', 'name') == [
+            'Комедия'
+        ], (
+            'Проверьте, что бэкенд поиска выбирается настройкой '
+            '`NGRAM_SEARCH_BACKEND`.'
+        )
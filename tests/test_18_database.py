@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+
+from api_yamdb.db.sqlite3.base import DatabaseWrapper
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    wrappers = []
+
+    def make(pool_size=2):
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'OPTIONS': {'pool_size': pool_size},
+        }, alias='pool_test')
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        wrapper.close()
+    DatabaseWrapper.close_pools()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Database:
+
+    def test_01_sqlite_pragmas(self, file_db):
+        db = file_db()
+        with db.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что для файла SQLite включается режим WAL.'
+            )
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+        assert db.settings_dict['OPTIONS'] == {'pool_size': 2}, (
+            'Проверьте, что параметры соединения собираются без '
+            'изменения общего словаря OPTIONS.'
+        )
+
+    def test_02_pool_reuses_connections(self, file_db):
+        db = file_db()
+        db.ensure_connection()
+        raw = db.connection
+        db.close()
+        db.ensure_connection()
+        assert db.connection is raw, (
+            'Проверьте, что закрытое соединение возвращается в пул и '
+            'используется повторно.'
+        )
+        other = file_db()
+        other.ensure_connection()
+        assert other.connection is not raw
+
+    def test_03_pool_rolls_back(self, file_db):
+        db = file_db()
+        with db.cursor() as cursor:
+            cursor.execute('CREATE TABLE pool_test (id integer)')
+        db.set_autocommit(False)
+        with db.cursor() as cursor:
+            cursor.execute('INSERT INTO pool_test VALUES (1)')
+        db.close()
+        db.ensure_connection()
+        with db.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM pool_test')
+            assert cursor.fetchone()[0] == 0, (
+                'Проверьте, что незавершённая транзакция откатывается '
+                'перед возвратом соединения в пул.'
+            )
+
+    def test_04_pool_disabled(self, file_db):
+        db = file_db(pool_size=0)
+        db.ensure_connection()
+        raw = db.connection
+        db.close()
+        db.ensure_connection()
+        assert db.connection is not raw
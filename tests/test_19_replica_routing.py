@@ -0,0 +1,106 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache import CacheHandler
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, connections
+from rest_framework.test import APIClient
+
+from api_yamdb.db.router import (
+    PIN_COOKIE, ReplicaRouter, get_pins, use_replicas
+)
+from reviews.models import Genre
+
+URL = '/api/v1/genres/'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Вторая база SQLite: снимок основной на момент вызова snapshot()."""
+    name = str(tmp_path / 'replica.sqlite3')
+    connections.settings['replica1'] = {
+        **connection.settings_dict,
+        'NAME': name,
+        'OPTIONS': {'pool_size': 0},
+    }
+    settings.REPLICA_DATABASES = ['replica1']
+
+    def snapshot():
+        connections['replica1'].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(name)
+        connection.connection.backup(target)
+        target.close()
+
+    snapshot()
+    yield snapshot
+    connections['replica1'].close()
+    del connections['replica1']
+    del connections.settings['replica1']
+
+
+def genre_names(client):
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK
+    return [genre['name'] for genre in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReplicaRouting:
+
+    def test_01_router(self, settings):
+        settings.REPLICA_DATABASES = ['replica1']
+        router = ReplicaRouter()
+        assert router.db_for_read(Genre) == 'default', (
+            'Проверьте, что вне запроса чтение идёт с основной базы.'
+        )
+        with use_replicas():
+            assert router.db_for_read(Genre) == 'replica1', (
+                'Проверьте, что при включённых репликах чтение идёт с них.'
+            )
+            assert router.db_for_write(Genre) == 'default'
+        assert router.allow_migrate('replica1', 'reviews') is False
+
+    def test_02_safe_requests_read_replica(self, admin_client, replica):
+        Genre.objects.create(name='Драма', slug='drama')
+        assert genre_names(admin_client) == [], (
+            'Проверьте, что GET-запрос читает данные с реплики.'
+        )
+        replica()
+        assert genre_names(admin_client) == ['Драма']
+
+    def test_03_read_your_writes(self, admin_client, user_client, replica):
+        response = admin_client.post(
+            URL, data={'name': 'Комедия', 'slug': 'comedy'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert PIN_COOKIE in response.cookies, (
+            'Проверьте, что после изменения данных клиент получает cookie '
+            'чтения с основной базы.'
+        )
+        admin_client.cookies.clear()
+        assert genre_names(admin_client) == ['Комедия'], (
+            'Проверьте, что автор изменения сразу видит его: запросы с тем '
+            'же заголовком Authorization читают с основной базы.'
+        )
+        assert genre_names(user_client) == []
+        assert genre_names(APIClient()) == ['Комедия'], (
+            'Проверьте, что промах кеша ответов читает с основной базы.'
+        )
+
+    def test_04_pins_cache(self, admin_client, replica, monkeypatch):
+        assert django_settings.REPLICA_PIN_CACHE_ALIAS not in (
+            'default', django_settings.JWT_DENYLIST_CACHE_ALIAS
+        ) and not isinstance(get_pins(), LocMemCache), (
+            'Проверьте, что метки чтения с основной базы хранятся в '
+            'отдельном кеше, общем для процессов.'
+        )
+        admin_client.post(URL, data={'name': 'Драма', 'slug': 'drama'})
+        admin_client.cookies.clear()
+        # Новые подключения к кешам — как в другом процессе.
+        monkeypatch.setattr('api_yamdb.db.router.caches', CacheHandler())
+        assert genre_names(admin_client) == ['Драма'], (
+            'Проверьте, что метка видна другим процессам.'
+        )
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken, get_denylist, revoke_token
+
+TOKEN_URL = '/api/v1/auth/token/'
+GENRES_URL = '/api/v1/genres/'
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def create_genre(client):
+    return client.post(GENRES_URL, data={'name': 'Драма', 'slug': 'drama'})
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20StatelessAuth:
+
+    def test_01_obtain_token_with_role(self, client, admin):
+        response = client.post(TOKEN_URL, data={
+            'username': admin.username,
+            'confirmation_code': default_token_generator.make_token(admin),
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{TOKEN_URL}` с верным кодом '
+            'подтверждения возвращает токен.'
+        )
+        token = RoleAccessToken(response.json()['access'])
+        assert token['role'] == admin.role, (
+            'Проверьте, что токен содержит роль пользователя.'
+        )
+
+    def test_02_no_user_query(self, admin, django_assert_num_queries):
+        client = client_for(RoleAccessToken.for_user(admin))
+        assert create_genre(client).status_code == HTTPStatus.CREATED, (
+            'Проверьте, что роль из токена даёт права администратора.'
+        )
+        with django_assert_num_queries(2):
+            # Только количество и список жанров, без запроса пользователя.
+            response = client.get(GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_revoke_token(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        revoke_token(token)
+        assert create_genre(client_for(token)).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что отозванный токен не принимается.'
+
+    def test_04_role_change_revokes_tokens(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        admin.role = admin.USER
+        admin.save()
+        assert create_genre(client_for(token)).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что смена роли отзывает выданные пользователю '
+            'токены.'
+        )
+        admin.role = admin.ADMIN
+        admin.save()
+        new_client = client_for(RoleAccessToken.for_user(admin))
+        assert create_genre(new_client).status_code == HTTPStatus.CREATED
+
+    def test_05_deleted_user(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        admin.delete()
+        assert create_genre(client_for(token)).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токены удалённого пользователя не принимаются.'
+
+    def test_06_shared_denylist(self, admin):
+        denylist = get_denylist()
+        assert denylist is not caches['default'] and not isinstance(
+            denylist, LocMemCache
+        ), (
+            'Проверьте, что отозванные токены хранятся в отдельном кеше, '
+            'общем для процессов.'
+        )
+        token = RoleAccessToken.for_user(admin)
+        revoke_token(token)
+        # Новое подключение к кешу — как в другом процессе.
+        other = caches.create_connection(settings.JWT_DENYLIST_CACHE_ALIAS)
+        assert other.get(f'jwt-denied:{token["jti"]}') is True
@@ -0,0 +1,69 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+
+
+def run_bench(path, **options):
+    call_command(
+        'bench_api', reviews=200, repeat=2, warmup=0, output=str(path),
+        stdout=StringIO(), **options
+    )
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BenchApi:
+
+    def test_01_all_endpoints(self, tmp_path):
+        report = run_bench(tmp_path / 'bench.json')
+        endpoints = report['endpoints']
+        for prefix in ('auth', 'users', 'genres', 'categories', 'titles',
+                       'reviews', 'comments', 'export'):
+            assert any(name.startswith(prefix) for name in endpoints), (
+                f'Проверьте, что бенчмарк вызывает эндпоинты `{prefix}`.'
+            )
+        failed = {
+            name: result['status'] for name, result in endpoints.items()
+            if result['status'] >= 400
+        }
+        assert not failed, (
+            f'Проверьте, что запросы бенчмарка выполняются успешно: {failed}'
+        )
+        result = endpoints['titles.list']
+        assert result['queries'] > 0
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert report['meta']['reviews'] == 200
+        assert not Review.objects.exists() and not Title.objects.exists(), (
+            'Проверьте, что данные бенчмарка откатываются.'
+        )
+
+    def test_02_compare(self, tmp_path):
+        baseline = run_bench(tmp_path / 'baseline.json', endpoints=['titles'])
+        baseline['endpoints']['titles.list']['queries'] -= 1
+        with open(tmp_path / 'baseline.json', 'w', encoding='utf-8') as f:
+            json.dump(baseline, f)
+        with pytest.raises(CommandError, match='titles.list'):
+            run_bench(
+                tmp_path / 'bench.json', endpoints=['titles'],
+                compare=str(tmp_path / 'baseline.json'), strict=True,
+                max_regression=1000,
+            )
+
+    def test_03_review_indexes_sort_step_fails(self, monkeypatch):
+        monkeypatch.setattr(
+            'reviews.management.commands.bench_review_indexes.SORT_MARKERS',
+            ('SCAN', 'SEARCH'),
+        )
+        with pytest.raises(CommandError, match='reviews, comments'):
+            call_command(
+                'bench_review_indexes', titles=2, users=2, comments=10,
+                repeat=1, stdout=StringIO(),
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что данные бенчмарка индексов откатываются.'
+        )
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/'
+
+
+def parse_server_timing(header):
+    return {
+        match['name']: (float(match['dur']), match['desc'])
+        for match in re.finditer(
+            r'(?P<name>\w+);dur=(?P<dur>[\d.]+)(?:;desc="(?P<desc>[^"]*)")?',
+            header
+        )
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22RequestTiming:
+
+    def test_01_server_timing(self, admin_client, settings, caplog):
+        create_titles(admin_client)
+        settings.REQUEST_TIMING_SAMPLE_RATE = 1
+        with caplog.at_level('INFO', logger='api.timing'):
+            response = admin_client.get(URL)
+        assert 'Server-Timing' in response, (
+            'Проверьте, что при включённых замерах ответ содержит заголовок '
+            '`Server-Timing`.'
+        )
+        timing = parse_server_timing(response['Server-Timing'])
+        assert set(timing) == {'db', 'serializer', 'view'}
+        # Токен фикстуры без роли: пользователь читается из базы.
+        assert timing['db'][1] == '4 queries', (
+            'Проверьте, что заголовок `Server-Timing` содержит число '
+            'SQL-запросов.'
+        )
+        assert 0 < timing['serializer'][0] <= timing['view'][0]
+        record = next(
+            record for record in caplog.records if record.name == 'api.timing'
+        )
+        assert record.timing['path'] == URL
+        assert record.timing['queries'] == 4, (
+            'Проверьте, что замеры пишутся в лог `api.timing`.'
+        )
+
+    def test_02_disabled(self, admin_client, settings):
+        settings.REQUEST_TIMING_SAMPLE_RATE = 0
+        response = admin_client.get(URL)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что замеры выключаются настройкой '
+            '`REQUEST_TIMING_SAMPLE_RATE`.'
+        )
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import registry
+from tests.utils import create_titles
+
+URL = '/metrics'
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def scrape(client):
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что `{URL}` доступен с локального адреса.'
+    )
+    return response.content.decode()
+
+
+def metric(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Metrics:
+
+    def test_01_request_metrics(self, client, admin_client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        text = scrape(client)
+        route = 'route="api:titles-list"'
+        assert metric(
+            text, f'http_requests_total{{{route},method="GET",status="200"}}'
+        ) == 2, 'Проверьте, что запросы считаются по маршруту и статусу.'
+        assert metric(
+            text, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'
+        ) == 4
+        assert metric(text, f'db_queries_total{{{route}}}') > 0
+        assert metric(text, 'db_query_duration_seconds_count') > 0
+        assert metric(
+            text, 'api_cache_requests_total{result="hit"}'
+        ) == 1, 'Проверьте, что считаются попадания в кеш ответов.'
+        assert metric(text, 'api_cache_hit_ratio') == 0.5
+        assert metric(text, 'email_queue_depth') == 0
+        assert metric(text, 'http_requests_in_flight') == 1
+
+    def test_02_other_threads(self, client):
+        thread = threading.Thread(target=client.get, args=('/api/v1/genres/',))
+        thread.start()
+        thread.join()
+        assert metric(
+            scrape(client),
+            'http_requests_total{route="api:genres-list",method="GET",'
+            'status="200"}'
+        ) == 1, 'Проверьте, что учитываются запросы завершённых потоков.'
+
+    def test_03_processes(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        labels = [['route', 'api:genres-list'], ['method', 'GET'],
+                  ['status', 200]]
+        for pid in (os.getppid(), 2 ** 22 + 1):
+            with open(tmp_path / f'{pid}.json', 'w') as f:
+                json.dump([
+                    ['http_requests_total', labels, 5],
+                    ['http_requests_in_flight', [], 3],
+                ], f)
+        text = scrape(client)
+        assert metric(
+            text,
+            'http_requests_total{route="api:genres-list",method="GET",'
+            'status="200"}'
+        ) == 10, 'Проверьте, что метрики процессов суммируются.'
+        assert metric(text, 'http_requests_in_flight') == 4, (
+            'Проверьте, что гауги завершившихся процессов не учитываются.'
+        )
+
+    def test_04_forbidden(self, client):
+        response = client.get(URL, REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_05_concurrent_flush(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_INTERVAL = 0
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(20):
+                    registry.inc('http_requests_in_flight', amount=0)
+                    registry.flush()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, (
+            'Проверьте, что одновременное сохранение метрик из нескольких '
+            'потоков не падает.'
+        )
+        assert os.listdir(tmp_path) == [f'{os.getpid()}.json']
+        with open(tmp_path / f'{os.getpid()}.json') as f:
+            json.load(f)
+
+        settings.METRICS_DIR = str(tmp_path / 'missing')
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ошибка сохранения метрик не ломает запрос.'
+        )
+
+    def test_06_email_metrics(self, client):
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'metrics@yamdb.fake', 'username': 'metrics'
+        })
+        assert response.status_code == HTTPStatus.OK
+        text = scrape(client)
+        assert metric(text, 'emails_total{result="sent"}') == 1, (
+            'Проверьте, что `/metrics` считает отправленные письма.'
+        )
+        assert metric(text, 'email_delivery_seconds_count') == 1, (
+            'Проверьте, что `/metrics` отдаёт время доставки писем.'
+        )
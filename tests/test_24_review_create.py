@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken
+from reviews.models import Review
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewCreate:
+
+    def test_01_create_review_queries(self, admin_client, user,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+        )
+        data = {'text': 'Отличный фильм', 'score': 9}
+        # произведение + BEGIN + INSERT + пересчёт рейтинга
+        with django_assert_num_queries(4):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` создаёт отзыв.'
+        )
+
+        response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Повторный отзыв запрещен.']
+        }
+        assert client.get(url).json()['count'] == 1
+
+    def test_02_other_integrity_errors(self, admin_client, user_client,
+                                       monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        def save(*args, **kwargs):
+            raise IntegrityError('CHECK constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(url, data={'text': 'Текст', 'score': 5})
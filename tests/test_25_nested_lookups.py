@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken
+from tests.utils import create_comments
+
+
+@pytest.fixture
+def token_client(admin):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+    )
+    return client
+
+
+def comments_url(title_id, review_id):
+    return f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25NestedLookups:
+
+    def test_01_wrong_parent(self, admin_client, user, user_client,
+                             moderator, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = comments_url(titles[1]['id'], reviews[0]['id'])
+        for response in (
+            admin_client.get(url),
+            admin_client.get(f'{url}{comments[0]["id"]}/'),
+            admin_client.post(url, data={'text': 'Комментарий'}),
+        ):
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что запрос к комментариям отзыва через чужое '
+                'произведение возвращает ответ со статусом 404.'
+            )
+
+    def test_02_parent_queries(self, admin_client, user, user_client,
+                               moderator, moderator_client, token_client,
+                               django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = comments_url(titles[0]['id'], reviews[0]['id'])
+        # отзыв + количество + комментарии с авторами
+        with django_assert_num_queries(3):
+            response = token_client.get(url)
+        assert response.json()['count'] == len(comments)
+        # комментарий с проверкой отзыва и произведения
+        with django_assert_num_queries(1):
+            response = token_client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        # отзыв + INSERT
+        with django_assert_num_queries(2):
+            response = token_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        # версия для ETag + количество + отзывы с авторами
+        with django_assert_num_queries(3):
+            response = token_client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            )
+        assert response.json()['count'] == len(reviews)
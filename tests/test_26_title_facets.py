@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.facets import filtered_facets, rebuild_facets, stored_facets
+from reviews.models import Category, Title
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/facets/'
+
+
+def counts(facet):
+    return {item.get('slug', item.get('from')): item['count']
+            for item in facet}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleFacets:
+
+    def test_01_facets(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert counts(data['genre']) == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }, 'Проверьте, что фасеты содержат число произведений по жанрам.'
+        assert counts(data['category']) == {'films': 1, 'books': 1}, (
+            'Проверьте, что фасеты содержат число произведений по '
+            'категориям.'
+        )
+        assert data['year'] == [{'from': 1980, 'to': 1989, 'count': 2}], (
+            'Проверьте, что фасеты содержат число произведений по '
+            'десятилетиям.'
+        )
+
+    def test_02_filtered(self, admin_client):
+        create_titles(admin_client)
+        data = admin_client.get(URL, {'genre': 'horror'}).json()
+        assert counts(data['genre']) == {'horror': 1, 'comedy': 1}, (
+            'Проверьте, что фасеты учитывают текущие фильтры.'
+        )
+        assert counts(data['category']) == {'films': 1}
+        response = admin_client.get(URL, {'year': 'год'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_served_from_counters(self, admin_client,
+                                     django_assert_num_queries):
+        create_titles(admin_client)
+        # Токен фикстуры без роли: пользователь читается из базы.
+        with django_assert_num_queries(4) as captured:
+            admin_client.get(URL)
+        assert not any(
+            'GROUP BY' in query['sql'] for query in captured.captured_queries
+        ), 'Проверьте, что фасеты без фильтров читаются из счётчиков.'
+
+    def test_04_incremental(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={
+            'genre': ['drama'], 'category': 'books', 'year': 2001
+        }, format='json')
+        data = admin_client.get(URL).json()
+        assert counts(data['genre']) == {'drama': 2}, (
+            'Проверьте, что счётчики жанров обновляются при изменении '
+            'жанров произведения.'
+        )
+        assert counts(data['category']) == {'books': 2}
+        assert counts(data['year']) == {1980: 1, 2000: 1}
+
+        title = Title.objects.get(pk=titles[1]['id'])
+        title.genre.add(*title.genre.model.objects.filter(slug='horror'))
+        title.genre.clear()
+        admin_client.delete(url)
+        Category.objects.filter(slug='books').delete()
+        expected = filtered_facets(Title.objects.all())
+        assert stored_facets() == expected, (
+            'Проверьте, что счётчики совпадают с подсчётом по произведениям '
+            'после изменений и удалений.'
+        )
+        rebuild_facets()
+        assert stored_facets() == expected
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/'
+
+
+def names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.fixture
+def titles(admin_client):
+    titles, _, _ = create_titles(admin_client)
+    data = {
+        'name': 'Матрица', 'year': 1999, 'genre': ['comedy'],
+        'category': 'films',
+    }
+    titles.append(admin_client.post(URL, data=data).json())
+    for title, rating, count in zip(titles, (7, 9, None), (3, 1, 0)):
+        Title.objects.filter(pk=title['id']).update(
+            rating=rating, rating_count=count
+        )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleOrdering:
+
+    def test_01_ordering(self, admin_client, titles):
+        assert names(admin_client.get(URL, {'ordering': '-rating'}))[:2] == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что произведения сортируются по рейтингу.'
+        assert names(admin_client.get(URL, {'ordering': 'year'})) == [
+            'Терминатор', 'Крепкий орешек', 'Матрица'
+        ], 'Проверьте, что произведения сортируются по году выхода.'
+        assert names(admin_client.get(URL, {'ordering': '-reviews'})) == [
+            'Терминатор', 'Крепкий орешек', 'Матрица'
+        ], 'Проверьте, что произведения сортируются по числу отзывов.'
+        response = admin_client.get(URL, {'ordering': 'description'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировка по неизвестному полю возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_02_ranges(self, admin_client, titles):
+        response = admin_client.get(URL, {'year_min': 1985, 'year_max': 1998})
+        assert names(response) == ['Крепкий орешек'], (
+            'Проверьте, что произведения фильтруются по диапазону лет.'
+        )
+        response = admin_client.get(
+            URL, {'rating_min': 8, 'genre': 'drama', 'year_min': 1980}
+        )
+        assert names(response) == ['Крепкий орешек'], (
+            'Проверьте, что произведения фильтруются по минимальному '
+            'рейтингу.'
+        )
+
+    def test_03_index_plans(self, titles):
+        queryset = Title.objects.all()
+        plan = TitleFilter(
+            {'ordering': '-rating'}, queryset=queryset
+        ).qs[:5].explain()
+        assert 'title_rating_idx' in plan and 'TEMP B-TREE' not in plan, (
+            'Проверьте, что сортировка по рейтингу читает индекс без '
+            f'отдельной сортировки:\n{plan}'
+        )
+        plan = TitleFilter(
+            {'year_min': 2010, 'year_max': 2020}, queryset=queryset
+        ).qs.explain()
+        assert 'title_year_idx' in plan, (
+            f'Проверьте, что диапазон лет читается по индексу:\n{plan}'
+        )
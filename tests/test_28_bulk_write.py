@@ -0,0 +1,217 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import TitleBulkListSerializer
+from reviews.facets import filtered_facets, stored_facets
+from reviews.models import Genre, Title
+from tests.utils import create_categories, create_genre, create_titles
+
+GENRES_URL = '/api/v1/genres/bulk/'
+TITLES_URL = '/api/v1/titles/bulk/'
+
+
+def count_queries(client, method, url, data):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    return response, len(context.captured_queries)
+
+
+def titles_payload(start, size):
+    return [
+        {
+            'name': f'Произведение {i}', 'year': 1990 + i % 30,
+            'genre': ['horror', 'drama'][:1 + i % 2],
+            'category': ['films', 'books'][i % 2],
+        }
+        for i in range(start, start + size)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28BulkWrite:
+
+    def test_01_genres(self, admin_client):
+        data = [{'name': f'Жанр {i}', 'slug': f'genre-{i}'} for i in range(3)]
+        response, small = count_queries(admin_client, 'post', GENRES_URL,
+                                        data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{GENRES_URL}` '
+            'создаёт жанры и возвращает ответ со статусом 201.'
+        )
+        assert response.json() == data
+        data = [{'name': f'Жанр {i}', 'slug': f'genre-{i}'}
+                for i in range(3, 33)]
+        _, large = count_queries(admin_client, 'post', GENRES_URL, data)
+        assert Genre.objects.count() == 33
+        assert small == large, (
+            'Проверьте, что число SQL-запросов массового создания не '
+            'зависит от числа объектов.'
+        )
+        response = admin_client.patch(GENRES_URL, data=[
+            {'slug': 'genre-0', 'name': 'Переименованный'}
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert Genre.objects.get(slug='genre-0').name == 'Переименованный'
+
+    def test_02_errors(self, admin_client):
+        create_genre(admin_client)
+        response = admin_client.post(GENRES_URL, data=[
+            {'name': 'Новый', 'slug': 'new'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Новый', 'slug': 'new'},
+            {'name': 'Без slug'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 4 and errors[0] == {}, (
+            'Проверьте, что ошибки возвращаются по элементу на объект.'
+        )
+        assert all('slug' in error for error in errors[1:])
+        assert not Genre.objects.filter(slug='new').exists(), (
+            'Проверьте, что при ошибках ничего не записывается.'
+        )
+        response = admin_client.post(GENRES_URL, data={'name': 'Один'},
+                                     format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.patch(GENRES_URL, data=[
+            {'slug': 'horror', 'name': 'Хоррор'},
+            {'name': 'Без slug'},
+            {'slug': 'drama'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что PATCH-запрос к `{GENRES_URL}` с элементом без '
+            'slug или без изменяемых полей возвращает ответ со статусом 400.'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'slug' in errors[1], (
+            'Проверьте, что элемент PATCH-запроса без slug получает ошибку '
+            'в поле slug.'
+        )
+        assert 'non_field_errors' in errors[2], (
+            'Проверьте, что элемент PATCH-запроса без изменяемых полей '
+            'получает ошибку.'
+        )
+        assert Genre.objects.get(slug='horror').name == 'Ужасы'
+
+    def test_03_permissions(self, client, user_client):
+        data = [{'name': 'Жанр', 'slug': 'genre'}]
+        assert client.post(
+            GENRES_URL, data=data, content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            GENRES_URL, data=data, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая запись доступна только администратору.'
+        )
+
+    def test_04_create_titles(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        response, small = count_queries(
+            admin_client, 'post', TITLES_URL, titles_payload(0, 2)
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{TITLES_URL}` '
+            'создаёт произведения.'
+        )
+        titles = response.json()
+        assert [title['name'] for title in titles] == [
+            'Произведение 0', 'Произведение 1'
+        ]
+        assert [genre['slug'] for genre in titles[1]['genre']] == [
+            'drama', 'horror'
+        ] or [genre['slug'] for genre in titles[1]['genre']] == [
+            'horror', 'drama'
+        ]
+        assert titles[0]['category']['slug'] == 'films'
+        _, large = count_queries(
+            admin_client, 'post', TITLES_URL, titles_payload(2, 40)
+        )
+        assert Title.objects.count() == 42
+        assert small == large, (
+            'Проверьте, что slug жанров и категорий разрешаются одним '
+            'запросом на весь список.'
+        )
+        assert stored_facets() == filtered_facets(Title.objects.all()), (
+            'Проверьте, что массовое создание обновляет счётчики фасетов.'
+        )
+
+    def test_05_update_titles(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        titles = admin_client.post(
+            TITLES_URL, data=titles_payload(0, 3), format='json'
+        ).json()
+        response = admin_client.patch(TITLES_URL, data=[
+            {'id': titles[0]['id'], 'genre': ['comedy', 'drama']},
+            {'id': titles[1]['id'], 'category': 'films', 'year': 2001},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос к `{TITLES_URL}` изменяет '
+            'произведения.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'comedy', 'drama'
+        }
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.category.slug, title.year) == ('films', 2001)
+        assert stored_facets() == filtered_facets(Title.objects.all())
+
+        response = admin_client.patch(TITLES_URL, data=[
+            {'id': titles[2]['id'], 'name': 'Новое название'},
+            {'id': 0, 'name': 'Нет такого'},
+            {'id': titles[2]['id'], 'genre': ['unknown']},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {} and 'id' in errors[1]
+        assert {'id', 'genre'} <= set(errors[2])
+        assert Title.objects.get(pk=titles[2]['id']).name == (
+            titles[2]['name']
+        )
+
+    def test_06_genre_rename_changes_title_etag(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = admin_client.get(url)['ETag']
+        response = admin_client.patch(GENRES_URL, data=[
+            {'slug': 'horror', 'name': 'Хоррор'}
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что массовое изменение жанров меняет `ETag` их '
+            'произведений.'
+        )
+        assert 'Хоррор' in [genre['name'] for genre in response.json()[
+            'genre'
+        ]]
+
+    def test_07_concurrent_write_kept(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        validate_batch = TitleBulkListSerializer.validate_batch
+
+        def validate_and_write(self, items, errors):
+            validate_batch(self, items, errors)
+            # Запись другого запроса между проверкой и транзакцией.
+            Title.objects.filter(pk=titles[1]['id']).update(
+                name='Параллельная запись'
+            )
+
+        monkeypatch.setattr(
+            TitleBulkListSerializer, 'validate_batch', validate_and_write
+        )
+        response = admin_client.patch(TITLES_URL, data=[
+            {'id': titles[0]['id'], 'name': 'Новое название'},
+            {'id': titles[1]['id'], 'year': 2001},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.name, title.year) == ('Параллельная запись', 2001), (
+            'Проверьте, что массовое изменение не затирает поля, '
+            'изменённые после проверки данных.'
+        )
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.facets import filtered_facets, stored_facets
+from reviews.models import Genre, Title
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def genres(admin_client):
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(6)
+    )
+    admin_client.post('/api/v1/categories/',
+                      data={'name': 'Фильмы', 'slug': 'films'})
+    return [f'genre-{i}' for i in range(6)]
+
+
+def write(client, method, url, genres):
+    data = {'name': 'Терминатор', 'year': 1984, 'category': 'films',
+            'genre': genres}
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED), (
+        response.json()
+    )
+    return response.json(), len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleWriteQueries:
+
+    def test_01_create(self, admin_client, genres):
+        _, one = write(admin_client, 'post', URL, genres[:1])
+        title, many = write(admin_client, 'post', URL, genres)
+        assert one == many, (
+            'Проверьте, что число SQL-запросов при создании произведения '
+            'не зависит от числа жанров.'
+        )
+        assert sorted(title['genre']) == genres
+        assert stored_facets() == filtered_facets(Title.objects.all())
+
+    def test_02_update(self, admin_client, genres):
+        title, _ = write(admin_client, 'post', URL, genres[:1])
+        url = f'{URL}{title["id"]}/'
+        _, one = write(admin_client, 'patch', url, genres[1:2])
+        title, many = write(admin_client, 'patch', url, genres[2:])
+        assert one == many, (
+            'Проверьте, что число SQL-запросов при изменении жанров '
+            'произведения не зависит от их числа.'
+        )
+        assert sorted(title['genre']) == genres[2:]
+        assert stored_facets() == filtered_facets(Title.objects.all()), (
+            'Проверьте, что счётчики фасетов учитывают замену жанров.'
+        )
+
+    def test_03_unknown_genre(self, admin_client, genres):
+        response = admin_client.post(URL, data={
+            'name': 'Терминатор', 'year': 1984, 'category': 'films',
+            'genre': ['genre-0', 'unknown', 'missing'],
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert len(response.json()['genre']) == 2, (
+            'Проверьте, что в ответе перечислены все несуществующие жанры.'
+        )
+        assert not Title.objects.exists()
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.pagination import KeysetPagination
+from reviews.models import Title
+from tests.utils import create_comments
+
+
+def fetch(client, settings, url, fast):
+    settings.FAST_LIST_SERIALIZERS = fast
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, url
+    return response.content
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30FastSerializers:
+
+    def test_01_parity(self, admin_client, settings, user, user_client,
+                       moderator, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        Title.objects.filter(pk=titles[1]['id']).update(category=None)
+        title = titles[0]['id']
+        review = reviews[0]['id']
+        base = f'/api/v1/titles/{title}/reviews/'
+        urls = [
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-rating',
+            '/api/v1/titles/?genre=horror',
+            '/api/v1/titles/?ordering=year&year_min=1980',
+            base,
+            f'{base}?cursor=',
+            f'{base}{review}/comments/',
+            f'{base}{review}/comments/?cursor=',
+        ]
+        for url in urls:
+            assert fetch(admin_client, settings, url, True) == fetch(
+                admin_client, settings, url, False
+            ), (
+                'Проверьте, что быстрый путь сериализации возвращает тот же '
+                f'JSON, что и сериализаторы DRF: `{url}`.'
+            )
+
+    def test_02_keyset_pages(self, admin_client, settings, monkeypatch,
+                             user, user_client, moderator, moderator_client):
+        _, _, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        monkeypatch.setattr(KeysetPagination, 'page_size', 1)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+        settings.FAST_LIST_SERIALIZERS = True
+        fast = admin_client.get(url).json()
+        settings.FAST_LIST_SERIALIZERS = False
+        slow = admin_client.get(url).json()
+        assert fast['next'] and fast['next'] == slow['next'], (
+            'Проверьте, что курсоры строятся по строкам быстрого пути.'
+        )
+        assert fetch(admin_client, settings, fast['next'], True) == fetch(
+            admin_client, settings, fast['next'], False
+        )
+
+    def test_03_queries(self, admin_client, settings, user, user_client,
+                        moderator, moderator_client,
+                        django_assert_max_num_queries):
+        create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        settings.FAST_LIST_SERIALIZERS = True
+        # Пользователь токена, количество, страница и жанры страницы.
+        with django_assert_max_num_queries(4):
+            admin_client.get('/api/v1/titles/')